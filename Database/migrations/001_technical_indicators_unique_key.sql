@@ -0,0 +1,16 @@
+-- 001: unique (symbol, date) key on technical_indicators --
+-- technical_indicators.py upserts on this key. Tables created before it was added were
+-- reloaded with TRUNCATE and have no key, so upserts append duplicate rows instead.
+-- Run once on such databases: keeps the newest row of every (symbol, date) and adds the key.
+ALTER TABLE `technical_indicators` ADD COLUMN `dedup_id` bigint NOT NULL AUTO_INCREMENT PRIMARY KEY;
+
+DELETE older FROM `technical_indicators` older
+JOIN `technical_indicators` newer
+  ON newer.`symbol` = older.`symbol` AND newer.`date` <=> older.`date` AND newer.`dedup_id` > older.`dedup_id`;
+
+ALTER TABLE `technical_indicators`
+  DROP COLUMN `dedup_id`,
+  ADD UNIQUE KEY `unique_symbol_date` (`symbol`,`date`);
+
+-- Recompute every symbol from daily_data on the next run
+DELETE FROM `indicator_state`;
@@ -0,0 +1,29 @@
+-- 002: per model version LSTM backtest and metrics --
+-- lstm_backtest and lstm_metrics were first created keyed on symbol (and date) only, with
+-- lstm_metrics holding finished MAE/MSE. forecast_data.py now keys both on the model version
+-- and keeps running error sums. The old rows carry no version, so both tables are recreated;
+-- the next forecast run predicts every window of the live models again.
+DROP TABLE IF EXISTS `lstm_backtest`;
+DROP TABLE IF EXISTS `lstm_metrics`;
+
+CREATE TABLE `lstm_backtest` (
+  `symbol` varchar(10) NOT NULL,
+  `model_version` varchar(32) NOT NULL,
+  `date` date NOT NULL,
+  `actual_close` float DEFAULT NULL,
+  `predicted_close` float DEFAULT NULL,
+  PRIMARY KEY (`symbol`,`model_version`,`date`),
+  CONSTRAINT `lstm_backtest_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `lstm_metrics` (
+  `symbol` varchar(10) NOT NULL,
+  `model_version` varchar(32) NOT NULL,
+  `n_predictions` int NOT NULL,
+  `sum_abs_error` double NOT NULL,
+  `sum_sq_error` double NOT NULL,
+  `last_date` date NOT NULL,
+  `generated_at` datetime NOT NULL,
+  PRIMARY KEY (`symbol`,`model_version`),
+  CONSTRAINT `lstm_metrics_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
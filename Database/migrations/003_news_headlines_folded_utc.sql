@@ -0,0 +1,46 @@
+-- 003: news_headlines id, folded flag and UTC timestamps --
+-- sentiment_series.py folds every headline with folded = 0 and marks it in the same
+-- transaction, and news_cache.py stores published_at in UTC like first_seen_at. Run once
+-- on databases that have news_headlines from before.
+-- Databases created from a table_creation.sql that already has `id` skip the first statement.
+ALTER TABLE `news_headlines`
+  ADD COLUMN `id` bigint NOT NULL AUTO_INCREMENT FIRST,
+  ADD UNIQUE KEY `idx_id` (`id`);
+
+ALTER TABLE `news_headlines`
+  ADD COLUMN `folded` tinyint(1) NOT NULL DEFAULT 0,
+  ADD KEY `idx_folded` (`folded`);
+
+-- finviz times were stored in US Eastern time. CONVERT_TZ needs the MySQL time zone tables
+-- (mysql_tzinfo_to_sql); without them it returns NULL, so check that first:
+--   SELECT CONVERT_TZ('2024-01-01 00:00:00', 'America/New_York', 'UTC');
+UPDATE `news_headlines` SET `published_at` = CONVERT_TZ(`published_at`, 'America/New_York', 'UTC')
+WHERE `published_at` IS NOT NULL;
+
+-- Rebuild the sentiment series from every stored headline (all start with folded = 0)
+DROP TABLE IF EXISTS `sentiment_daily`;
+DROP TABLE IF EXISTS `sentiment_hourly`;
+DROP TABLE IF EXISTS `sentiment_state`;
+
+CREATE TABLE `sentiment_daily` (
+  `symbol` varchar(10) NOT NULL,
+  `date` date NOT NULL,
+  `n_headlines` int NOT NULL,
+  `sum_score` double NOT NULL,
+  PRIMARY KEY (`symbol`,`date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `sentiment_hourly` (
+  `symbol` varchar(10) NOT NULL,
+  `hour` datetime NOT NULL,
+  `n_headlines` int NOT NULL,
+  `sum_score` double NOT NULL,
+  PRIMARY KEY (`symbol`,`hour`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+CREATE TABLE `sentiment_state` (
+  `symbol` varchar(10) NOT NULL,
+  `state` json NOT NULL,
+  `updated_at` datetime NOT NULL,
+  PRIMARY KEY (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
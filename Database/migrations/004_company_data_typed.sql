@@ -0,0 +1,110 @@
+-- 004: typed company_data columns --
+-- company_data stored every field as text, including the API's placeholders ('None', '-',
+-- '', 'N/A'). company_data.py now stores typed values with NULL for missing ones. The table
+-- cannot be recreated (daily_data and the other tables reference it), and a plain MODIFY
+-- fails in strict mode on the placeholders, so they are set to NULL first.
+UPDATE `company_data` SET
+  `AssetType` = IF(`AssetType` IN ('None', '-', '', 'N/A'), NULL, `AssetType`),
+  `Name` = IF(`Name` IN ('None', '-', '', 'N/A'), NULL, `Name`),
+  `Description` = IF(`Description` IN ('None', '-', '', 'N/A'), NULL, `Description`),
+  `CIK` = IF(`CIK` IN ('None', '-', '', 'N/A'), NULL, `CIK`),
+  `Exchange` = IF(`Exchange` IN ('None', '-', '', 'N/A'), NULL, `Exchange`),
+  `Currency` = IF(`Currency` IN ('None', '-', '', 'N/A'), NULL, `Currency`),
+  `Country` = IF(`Country` IN ('None', '-', '', 'N/A'), NULL, `Country`),
+  `Sector` = IF(`Sector` IN ('None', '-', '', 'N/A'), NULL, `Sector`),
+  `Industry` = IF(`Industry` IN ('None', '-', '', 'N/A'), NULL, `Industry`),
+  `Address` = IF(`Address` IN ('None', '-', '', 'N/A'), NULL, `Address`),
+  `OfficialSite` = IF(`OfficialSite` IN ('None', '-', '', 'N/A'), NULL, `OfficialSite`),
+  `FiscalYearEnd` = IF(`FiscalYearEnd` IN ('None', '-', '', 'N/A'), NULL, `FiscalYearEnd`),
+  `LatestQuarter` = IF(`LatestQuarter` IN ('None', '-', '', 'N/A'), NULL, `LatestQuarter`),
+  `MarketCapitalization` = IF(`MarketCapitalization` IN ('None', '-', '', 'N/A'), NULL, `MarketCapitalization`),
+  `EBITDA` = IF(`EBITDA` IN ('None', '-', '', 'N/A'), NULL, `EBITDA`),
+  `PERatio` = IF(`PERatio` IN ('None', '-', '', 'N/A'), NULL, `PERatio`),
+  `PEGRatio` = IF(`PEGRatio` IN ('None', '-', '', 'N/A'), NULL, `PEGRatio`),
+  `BookValue` = IF(`BookValue` IN ('None', '-', '', 'N/A'), NULL, `BookValue`),
+  `DividendPerShare` = IF(`DividendPerShare` IN ('None', '-', '', 'N/A'), NULL, `DividendPerShare`),
+  `DividendYield` = IF(`DividendYield` IN ('None', '-', '', 'N/A'), NULL, `DividendYield`),
+  `EPS` = IF(`EPS` IN ('None', '-', '', 'N/A'), NULL, `EPS`),
+  `RevenuePerShareTTM` = IF(`RevenuePerShareTTM` IN ('None', '-', '', 'N/A'), NULL, `RevenuePerShareTTM`),
+  `ProfitMargin` = IF(`ProfitMargin` IN ('None', '-', '', 'N/A'), NULL, `ProfitMargin`),
+  `OperatingMarginTTM` = IF(`OperatingMarginTTM` IN ('None', '-', '', 'N/A'), NULL, `OperatingMarginTTM`),
+  `ReturnOnAssetsTTM` = IF(`ReturnOnAssetsTTM` IN ('None', '-', '', 'N/A'), NULL, `ReturnOnAssetsTTM`),
+  `ReturnOnEquityTTM` = IF(`ReturnOnEquityTTM` IN ('None', '-', '', 'N/A'), NULL, `ReturnOnEquityTTM`),
+  `RevenueTTM` = IF(`RevenueTTM` IN ('None', '-', '', 'N/A'), NULL, `RevenueTTM`),
+  `GrossProfitTTM` = IF(`GrossProfitTTM` IN ('None', '-', '', 'N/A'), NULL, `GrossProfitTTM`),
+  `DilutedEPSTTM` = IF(`DilutedEPSTTM` IN ('None', '-', '', 'N/A'), NULL, `DilutedEPSTTM`),
+  `QuarterlyEarningsGrowthYOY` = IF(`QuarterlyEarningsGrowthYOY` IN ('None', '-', '', 'N/A'), NULL, `QuarterlyEarningsGrowthYOY`),
+  `QuarterlyRevenueGrowthYOY` = IF(`QuarterlyRevenueGrowthYOY` IN ('None', '-', '', 'N/A'), NULL, `QuarterlyRevenueGrowthYOY`),
+  `AnalystTargetPrice` = IF(`AnalystTargetPrice` IN ('None', '-', '', 'N/A'), NULL, `AnalystTargetPrice`),
+  `AnalystRatingStrongBuy` = IF(`AnalystRatingStrongBuy` IN ('None', '-', '', 'N/A'), NULL, `AnalystRatingStrongBuy`),
+  `AnalystRatingBuy` = IF(`AnalystRatingBuy` IN ('None', '-', '', 'N/A'), NULL, `AnalystRatingBuy`),
+  `AnalystRatingHold` = IF(`AnalystRatingHold` IN ('None', '-', '', 'N/A'), NULL, `AnalystRatingHold`),
+  `AnalystRatingSell` = IF(`AnalystRatingSell` IN ('None', '-', '', 'N/A'), NULL, `AnalystRatingSell`),
+  `AnalystRatingStrongSell` = IF(`AnalystRatingStrongSell` IN ('None', '-', '', 'N/A'), NULL, `AnalystRatingStrongSell`),
+  `TrailingPE` = IF(`TrailingPE` IN ('None', '-', '', 'N/A'), NULL, `TrailingPE`),
+  `ForwardPE` = IF(`ForwardPE` IN ('None', '-', '', 'N/A'), NULL, `ForwardPE`),
+  `PriceToSalesRatioTTM` = IF(`PriceToSalesRatioTTM` IN ('None', '-', '', 'N/A'), NULL, `PriceToSalesRatioTTM`),
+  `PriceToBookRatio` = IF(`PriceToBookRatio` IN ('None', '-', '', 'N/A'), NULL, `PriceToBookRatio`),
+  `EVToRevenue` = IF(`EVToRevenue` IN ('None', '-', '', 'N/A'), NULL, `EVToRevenue`),
+  `EVToEBITDA` = IF(`EVToEBITDA` IN ('None', '-', '', 'N/A'), NULL, `EVToEBITDA`),
+  `Beta` = IF(`Beta` IN ('None', '-', '', 'N/A'), NULL, `Beta`),
+  `52WeekHigh` = IF(`52WeekHigh` IN ('None', '-', '', 'N/A'), NULL, `52WeekHigh`),
+  `52WeekLow` = IF(`52WeekLow` IN ('None', '-', '', 'N/A'), NULL, `52WeekLow`),
+  `50DayMovingAverage` = IF(`50DayMovingAverage` IN ('None', '-', '', 'N/A'), NULL, `50DayMovingAverage`),
+  `200DayMovingAverage` = IF(`200DayMovingAverage` IN ('None', '-', '', 'N/A'), NULL, `200DayMovingAverage`),
+  `SharesOutstanding` = IF(`SharesOutstanding` IN ('None', '-', '', 'N/A'), NULL, `SharesOutstanding`),
+  `DividendDate` = IF(`DividendDate` IN ('None', '-', '', 'N/A'), NULL, `DividendDate`),
+  `ExDividendDate` = IF(`ExDividendDate` IN ('None', '-', '', 'N/A'), NULL, `ExDividendDate`);
+
+ALTER TABLE `company_data`
+  MODIFY `AssetType` varchar(32) DEFAULT NULL,
+  MODIFY `Name` varchar(255) DEFAULT NULL,
+  MODIFY `Description` text DEFAULT NULL,
+  MODIFY `CIK` varchar(20) DEFAULT NULL,
+  MODIFY `Exchange` varchar(16) DEFAULT NULL,
+  MODIFY `Currency` varchar(8) DEFAULT NULL,
+  MODIFY `Country` varchar(64) DEFAULT NULL,
+  MODIFY `Sector` varchar(128) DEFAULT NULL,
+  MODIFY `Industry` varchar(255) DEFAULT NULL,
+  MODIFY `Address` text DEFAULT NULL,
+  MODIFY `OfficialSite` varchar(255) DEFAULT NULL,
+  MODIFY `FiscalYearEnd` varchar(16) DEFAULT NULL,
+  MODIFY `LatestQuarter` date DEFAULT NULL,
+  MODIFY `MarketCapitalization` bigint DEFAULT NULL,
+  MODIFY `EBITDA` bigint DEFAULT NULL,
+  MODIFY `PERatio` double DEFAULT NULL,
+  MODIFY `PEGRatio` double DEFAULT NULL,
+  MODIFY `BookValue` double DEFAULT NULL,
+  MODIFY `DividendPerShare` double DEFAULT NULL,
+  MODIFY `DividendYield` double DEFAULT NULL,
+  MODIFY `EPS` double DEFAULT NULL,
+  MODIFY `RevenuePerShareTTM` double DEFAULT NULL,
+  MODIFY `ProfitMargin` double DEFAULT NULL,
+  MODIFY `OperatingMarginTTM` double DEFAULT NULL,
+  MODIFY `ReturnOnAssetsTTM` double DEFAULT NULL,
+  MODIFY `ReturnOnEquityTTM` double DEFAULT NULL,
+  MODIFY `RevenueTTM` bigint DEFAULT NULL,
+  MODIFY `GrossProfitTTM` bigint DEFAULT NULL,
+  MODIFY `DilutedEPSTTM` double DEFAULT NULL,
+  MODIFY `QuarterlyEarningsGrowthYOY` double DEFAULT NULL,
+  MODIFY `QuarterlyRevenueGrowthYOY` double DEFAULT NULL,
+  MODIFY `AnalystTargetPrice` double DEFAULT NULL,
+  MODIFY `AnalystRatingStrongBuy` int DEFAULT NULL,
+  MODIFY `AnalystRatingBuy` int DEFAULT NULL,
+  MODIFY `AnalystRatingHold` int DEFAULT NULL,
+  MODIFY `AnalystRatingSell` int DEFAULT NULL,
+  MODIFY `AnalystRatingStrongSell` int DEFAULT NULL,
+  MODIFY `TrailingPE` double DEFAULT NULL,
+  MODIFY `ForwardPE` double DEFAULT NULL,
+  MODIFY `PriceToSalesRatioTTM` double DEFAULT NULL,
+  MODIFY `PriceToBookRatio` double DEFAULT NULL,
+  MODIFY `EVToRevenue` double DEFAULT NULL,
+  MODIFY `EVToEBITDA` double DEFAULT NULL,
+  MODIFY `Beta` double DEFAULT NULL,
+  MODIFY `52WeekHigh` double DEFAULT NULL,
+  MODIFY `52WeekLow` double DEFAULT NULL,
+  MODIFY `50DayMovingAverage` double DEFAULT NULL,
+  MODIFY `200DayMovingAverage` double DEFAULT NULL,
+  MODIFY `SharesOutstanding` bigint DEFAULT NULL,
+  MODIFY `DividendDate` date DEFAULT NULL,
+  MODIFY `ExDividendDate` date DEFAULT NULL;
@@ -1,57 +1,58 @@
 -- CREATE TABLE `company_data` --
+-- Typed columns, parsed by scheduled_update_database/company_data.py (missing values are NULL)
 CREATE TABLE `company_data` (
   `symbol` varchar(10) NOT NULL,
-  `AssetType` text,
-  `Name` text,
-  `Description` text,
-  `CIK` text,
-  `Exchange` text,
-  `Currency` text,
-  `Country` text,
-  `Sector` text,
-  `Industry` text,
-  `Address` text,
-  `OfficialSite` text,
-  `FiscalYearEnd` text,
-  `LatestQuarter` text,
-  `MarketCapitalization` text,
-  `EBITDA` text,
-  `PERatio` text,
-  `PEGRatio` text,
-  `BookValue` text,
-  `DividendPerShare` text,
-  `DividendYield` text,
-  `EPS` text,
-  `RevenuePerShareTTM` text,
-  `ProfitMargin` text,
-  `OperatingMarginTTM` text,
-  `ReturnOnAssetsTTM` text,
-  `ReturnOnEquityTTM` text,
-  `RevenueTTM` text,
-  `GrossProfitTTM` text,
-  `DilutedEPSTTM` text,
-  `QuarterlyEarningsGrowthYOY` text,
-  `QuarterlyRevenueGrowthYOY` text,
-  `AnalystTargetPrice` text,
-  `AnalystRatingStrongBuy` text,
-  `AnalystRatingBuy` text,
-  `AnalystRatingHold` text,
-  `AnalystRatingSell` text,
-  `AnalystRatingStrongSell` text,
-  `TrailingPE` text,
-  `ForwardPE` text,
-  `PriceToSalesRatioTTM` text,
-  `PriceToBookRatio` text,
-  `EVToRevenue` text,
-  `EVToEBITDA` text,
-  `Beta` text,
-  `52WeekHigh` text,
-  `52WeekLow` text,
-  `50DayMovingAverage` text,
-  `200DayMovingAverage` text,
-  `SharesOutstanding` text,
-  `DividendDate` text,
-  `ExDividendDate` text,
+  `AssetType` varchar(32) DEFAULT NULL,
+  `Name` varchar(255) DEFAULT NULL,
+  `Description` text DEFAULT NULL,
+  `CIK` varchar(20) DEFAULT NULL,
+  `Exchange` varchar(16) DEFAULT NULL,
+  `Currency` varchar(8) DEFAULT NULL,
+  `Country` varchar(64) DEFAULT NULL,
+  `Sector` varchar(128) DEFAULT NULL,
+  `Industry` varchar(255) DEFAULT NULL,
+  `Address` text DEFAULT NULL,
+  `OfficialSite` varchar(255) DEFAULT NULL,
+  `FiscalYearEnd` varchar(16) DEFAULT NULL,
+  `LatestQuarter` date DEFAULT NULL,
+  `MarketCapitalization` bigint DEFAULT NULL,
+  `EBITDA` bigint DEFAULT NULL,
+  `PERatio` double DEFAULT NULL,
+  `PEGRatio` double DEFAULT NULL,
+  `BookValue` double DEFAULT NULL,
+  `DividendPerShare` double DEFAULT NULL,
+  `DividendYield` double DEFAULT NULL,
+  `EPS` double DEFAULT NULL,
+  `RevenuePerShareTTM` double DEFAULT NULL,
+  `ProfitMargin` double DEFAULT NULL,
+  `OperatingMarginTTM` double DEFAULT NULL,
+  `ReturnOnAssetsTTM` double DEFAULT NULL,
+  `ReturnOnEquityTTM` double DEFAULT NULL,
+  `RevenueTTM` bigint DEFAULT NULL,
+  `GrossProfitTTM` bigint DEFAULT NULL,
+  `DilutedEPSTTM` double DEFAULT NULL,
+  `QuarterlyEarningsGrowthYOY` double DEFAULT NULL,
+  `QuarterlyRevenueGrowthYOY` double DEFAULT NULL,
+  `AnalystTargetPrice` double DEFAULT NULL,
+  `AnalystRatingStrongBuy` int DEFAULT NULL,
+  `AnalystRatingBuy` int DEFAULT NULL,
+  `AnalystRatingHold` int DEFAULT NULL,
+  `AnalystRatingSell` int DEFAULT NULL,
+  `AnalystRatingStrongSell` int DEFAULT NULL,
+  `TrailingPE` double DEFAULT NULL,
+  `ForwardPE` double DEFAULT NULL,
+  `PriceToSalesRatioTTM` double DEFAULT NULL,
+  `PriceToBookRatio` double DEFAULT NULL,
+  `EVToRevenue` double DEFAULT NULL,
+  `EVToEBITDA` double DEFAULT NULL,
+  `Beta` double DEFAULT NULL,
+  `52WeekHigh` double DEFAULT NULL,
+  `52WeekLow` double DEFAULT NULL,
+  `50DayMovingAverage` double DEFAULT NULL,
+  `200DayMovingAverage` double DEFAULT NULL,
+  `SharesOutstanding` bigint DEFAULT NULL,
+  `DividendDate` date DEFAULT NULL,
+  `ExDividendDate` date DEFAULT NULL,
   PRIMARY KEY (`symbol`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
@@ -76,6 +77,139 @@ CREATE TABLE `technical_indicators` (
   `ema` decimal(10,4) DEFAULT NULL,
   `rsi` decimal(10,4) DEFAULT NULL,
   KEY `symbol` (`symbol`),
+  UNIQUE KEY `unique_symbol_date` (`symbol`,`date`),
   CONSTRAINT `technical_indicators_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
 
+-- CREATE TABLE `indicator_state` --
+-- Per-symbol incremental indicator state (SMA window, last EMA, Wilder averages)
+CREATE TABLE `indicator_state` (
+  `symbol` varchar(10) NOT NULL,
+  `last_date` date NOT NULL,
+  `state` json NOT NULL,
+  PRIMARY KEY (`symbol`),
+  CONSTRAINT `indicator_state_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `lstm_forecasts` --
+-- Latest 30-day LSTM forecast per symbol, written by scheduled_update_database/forecast_data.py
+CREATE TABLE `lstm_forecasts` (
+  `symbol` varchar(10) NOT NULL,
+  `date` date NOT NULL,
+  `predicted_close` float DEFAULT NULL,
+  `generated_at` datetime NOT NULL,
+  PRIMARY KEY (`symbol`,`date`),
+  CONSTRAINT `lstm_forecasts_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `lstm_backtest` --
+-- In-sample (Actual vs Predicted) LSTM predictions per symbol, model version and date.
+-- Each forecast run only adds the days the model version has not predicted yet.
+-- Only the current and the previous model version of each symbol are kept.
+CREATE TABLE `lstm_backtest` (
+  `symbol` varchar(10) NOT NULL,
+  `model_version` varchar(32) NOT NULL,
+  `date` date NOT NULL,
+  `actual_close` float DEFAULT NULL,
+  `predicted_close` float DEFAULT NULL,
+  PRIMARY KEY (`symbol`,`model_version`,`date`),
+  CONSTRAINT `lstm_backtest_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `lstm_metrics` --
+-- Running error sums of the in-sample predictions per symbol and model version
+-- (MAE = sum_abs_error / n_predictions, MSE = sum_sq_error / n_predictions)
+CREATE TABLE `lstm_metrics` (
+  `symbol` varchar(10) NOT NULL,
+  `model_version` varchar(32) NOT NULL,
+  `n_predictions` int NOT NULL,
+  `sum_abs_error` double NOT NULL,
+  `sum_sq_error` double NOT NULL,
+  `last_date` date NOT NULL,
+  `generated_at` datetime NOT NULL,
+  PRIMARY KEY (`symbol`,`model_version`),
+  CONSTRAINT `lstm_metrics_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `investment_scores` --
+-- Daily investment factors, composite score and signal, written by scheduled_update_database/score_data.py
+CREATE TABLE `investment_scores` (
+  `symbol` varchar(10) NOT NULL,
+  `date` date NOT NULL,
+  `price_momentum` double DEFAULT NULL,
+  `volatility_score` double DEFAULT NULL,
+  `volume_score` double DEFAULT NULL,
+  `ema_sma_score` tinyint DEFAULT NULL,
+  `rsi_score` tinyint DEFAULT NULL,
+  `investment_score` double DEFAULT NULL,
+  `signal` varchar(4) DEFAULT NULL,
+  PRIMARY KEY (`symbol`,`date`),
+  CONSTRAINT `investment_scores_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `score_state` --
+-- Checkpointed streaming score state (ring buffers and running sums) per symbol
+CREATE TABLE `score_state` (
+  `symbol` varchar(10) NOT NULL,
+  `last_date` date NOT NULL,
+  `state` json NOT NULL,
+  PRIMARY KEY (`symbol`),
+  CONSTRAINT `score_state_ibfk_1` FOREIGN KEY (`symbol`) REFERENCES `company_data` (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `ingestion_runs` --
+-- Last successful run of each scheduled job; the dashboard uses the latest as its data version
+CREATE TABLE `ingestion_runs` (
+  `job` varchar(64) NOT NULL,
+  `finished_at` datetime NOT NULL,
+  PRIMARY KEY (`job`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `news_headlines` --
+-- Scraped finviz headlines with their timestamp (UTC) and VADER score; each headline is scored once.
+-- `folded` marks the headlines already counted in the sentiment series.
+CREATE TABLE `news_headlines` (
+  `id` bigint NOT NULL AUTO_INCREMENT,
+  `ticker` varchar(10) NOT NULL,
+  `headline_hash` char(40) NOT NULL,
+  `title` varchar(512) NOT NULL,
+  `url` varchar(1024) DEFAULT NULL,
+  `published_at` datetime DEFAULT NULL,
+  `sentiment_score` double NOT NULL,
+  `first_seen_at` datetime NOT NULL,
+  `folded` tinyint(1) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`ticker`,`headline_hash`),
+  UNIQUE KEY `idx_id` (`id`),
+  KEY `idx_folded` (`folded`),
+  KEY `idx_headline_hash` (`headline_hash`),
+  KEY `idx_ticker_published_at` (`ticker`,`published_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `sentiment_daily` --
+-- Headline count and score sum per symbol and day (keyed like daily_data so the two join on date)
+CREATE TABLE `sentiment_daily` (
+  `symbol` varchar(10) NOT NULL,
+  `date` date NOT NULL,
+  `n_headlines` int NOT NULL,
+  `sum_score` double NOT NULL,
+  PRIMARY KEY (`symbol`,`date`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `sentiment_hourly` --
+-- Headline count and score sum per symbol and hour
+CREATE TABLE `sentiment_hourly` (
+  `symbol` varchar(10) NOT NULL,
+  `hour` datetime NOT NULL,
+  `n_headlines` int NOT NULL,
+  `sum_score` double NOT NULL,
+  PRIMARY KEY (`symbol`,`hour`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
+
+-- CREATE TABLE `sentiment_state` --
+-- Exponentially decayed sums per symbol
+CREATE TABLE `sentiment_state` (
+  `symbol` varchar(10) NOT NULL,
+  `state` json NOT NULL,
+  `updated_at` datetime NOT NULL,
+  PRIMARY KEY (`symbol`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci;
@@ -1,36 +1,50 @@
 import os
-import requests
+import sys
 import pandas as pd
 from sqlalchemy import create_engine
+from fetch_engine import fetch_all, failed_keys
 
 # API Key and symbols
 api_key = os.getenv('API_KEY_company_data')
 symbols = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
-all_overview_data = []
 
-# Function to fetch data from a given API endpoint
-def fetch_data(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status() 
-        data = response.json()
-        if "Error Message" in data or "Note" in data: 
-            print(f"Error fetching data: {data.get('Error Message', data.get('Note'))}")
-            return None
-        return data
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
-        return None
+# Fetch data for every symbol concurrently through the shared rate-limited engine
+results = fetch_all({symbol: {'function': 'OVERVIEW', 'symbol': symbol} for symbol in symbols}, api_key)
+all_overview_data = [data for data in results.values() if data]
+failed = failed_keys(results)
 
-# Fetch data for each symbol
-for symbol in symbols:
-    overview_url = f'https://www.alphavantage.co/query?function=OVERVIEW&symbol={symbol}&apikey={api_key}'
-    overview_data = fetch_data(overview_url)
-    if overview_data:
-        all_overview_data.append(overview_data)
+# Typed columns of company_data; everything else is stored as text
+INTEGER_COLUMNS = [
+    'MarketCapitalization', 'EBITDA', 'RevenueTTM', 'GrossProfitTTM', 'SharesOutstanding',
+    'AnalystRatingStrongBuy', 'AnalystRatingBuy', 'AnalystRatingHold', 'AnalystRatingSell', 'AnalystRatingStrongSell',
+]
+FLOAT_COLUMNS = [
+    'PERatio', 'PEGRatio', 'BookValue', 'DividendPerShare', 'DividendYield', 'EPS', 'RevenuePerShareTTM',
+    'ProfitMargin', 'OperatingMarginTTM', 'ReturnOnAssetsTTM', 'ReturnOnEquityTTM', 'DilutedEPSTTM',
+    'QuarterlyEarningsGrowthYOY', 'QuarterlyRevenueGrowthYOY', 'AnalystTargetPrice', 'TrailingPE', 'ForwardPE',
+    'PriceToSalesRatioTTM', 'PriceToBookRatio', 'EVToRevenue', 'EVToEBITDA', 'Beta',
+    '52WeekHigh', '52WeekLow', '50DayMovingAverage', '200DayMovingAverage',
+]
+DATE_COLUMNS = ['LatestQuarter', 'DividendDate', 'ExDividendDate']
+MISSING_VALUES = ['None', '-', '', 'N/A']
 
-# Convert the collected data to a pandas DataFrame
-df = pd.DataFrame(all_overview_data)
+# Function to parse the API's strings once into numbers and dates; placeholders such as
+# 'None' or '-' (and anything else unparseable) become NULL
+def parse_overview(df):
+    df = df.where(~df.isin(MISSING_VALUES))
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='%Y-%m-%d', errors='coerce').dt.date
+    return df
+
+# Convert the collected data to a pandas DataFrame of typed values
+df = parse_overview(pd.DataFrame(all_overview_data))
 
 # Database configuration
 db_config = {
@@ -64,18 +78,29 @@ updates = ', '.join([f"{col} = VALUES({col})" for col in df.columns])
 # Prepare the final query
 final_query = insert_query.format(columns=columns, values=values, updates=updates)
 
-# Convert DataFrame to list of tuples
-data_tuples = [tuple(row) for row in df.to_numpy()]
+# Convert DataFrame to list of tuples (missing values as NULL)
+data_tuples = [tuple(row) for row in df.astype(object).where(df.notna(), None).to_numpy()]
 
 # Insert or update data in the database
 conn = engine.raw_connection()
+cursor = conn.cursor()
 try:
-    cursor = conn.cursor()
     cursor.executemany(final_query, data_tuples)
+    # Record the run; the dashboard keys its caches on the latest one
+    cursor.execute(
+        "INSERT INTO ingestion_runs (job, finished_at) VALUES (%s, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE finished_at = VALUES(finished_at)", ('company_data',))
     conn.commit()
     print("Data upserted successfully.")
 except Exception as e:
+    conn.rollback()
     print(f"Failed to upsert data into MySQL table: {e}")
+    sys.exit(1)
 finally:
     cursor.close()
     conn.close()
+
+if failed:
+    print(f"Failed to fetch company data for: {', '.join(failed)}")
+    sys.exit(1)
+
@@ -1,35 +1,52 @@
 import os
-import requests
+import sys
+import numpy as np
 import pandas as pd
 from sqlalchemy import create_engine, text
+from fetch_engine import fetch_all, failed_keys
 
 # API Key and symbols
 api_key = os.getenv('API_KEY_daily_data')
 symbols = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
 
-# Initialize lists to store all the JSON data
-all_daily_data = []
+# Number of trading days returned by outputsize=compact
+COMPACT_SIZE = 100
 
-# Function to fetch data from a given API endpoint
-def fetch_data(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for HTTP errors
-        data = response.json()
-        if "Error Message" in data or "Note" in data:  # Check for API error messages
-            print(f"Error fetching data: {data.get('Error Message', data.get('Note'))}")
-            return None
-        return data
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
-        return None
-
-# Loop through each symbol and fetch the required data
-for symbol in symbols:
-    daily_url = f'https://www.alphavantage.co/query?function=TIME_SERIES_DAILY&symbol={symbol}&outputsize=full&apikey={api_key}'
-    daily_data = fetch_data(daily_url)
-    if daily_data:
-        all_daily_data.append(daily_data)
+# Database configuration
+db_config = {
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'host': os.getenv('DB_HOST'),
+    'port': os.getenv('DB_PORT'),
+    'database': os.getenv('DB_NAME')
+}
+ca_cert_path = os.getenv('CA_CERT_PATH')
+
+# Create SQLAlchemy engine to connect to Aiven MySQL Database with SSL
+connection_string = (
+    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
+    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+    f"ssl_verify_cert=true&ssl_ca={ca_cert_path}"
+)
+engine = create_engine(connection_string)
+
+# Function to read the latest stored date per symbol (the ingestion watermark)
+def get_watermarks():
+    query = text("SELECT symbol, MAX(date) AS last_date FROM daily_data GROUP BY symbol")
+    with engine.connect() as connection:
+        rows = connection.execute(query).fetchall()
+    return {row[0]: pd.Timestamp(row[1]) for row in rows if row[1] is not None}
+
+# Function to pick the smallest API window that still covers the gap since the watermark
+def choose_outputsize(last_date):
+    if last_date is None:
+        return 'full'  # First load for this symbol
+    # Weekday count ignores market holidays, so it only ever overestimates the gap
+    missing_days = np.busday_count(last_date.date(), pd.Timestamp.today().date())
+    return 'compact' if missing_days < COMPACT_SIZE else 'full'
+
+def daily_params(symbol, outputsize):
+    return {'function': 'TIME_SERIES_DAILY', 'symbol': symbol, 'outputsize': outputsize}
 
 # Convert JSON data to DataFrame
 def json_to_dataframe(data_list, key, symbol_key):
@@ -52,9 +69,6 @@ def json_to_dataframe(data_list, key, symbol_key):
 
     return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
-# Convert and process daily data
-daily_df = json_to_dataframe(all_daily_data, 'Time Series (Daily)', '2. Symbol')
-
 def clean_transform(df, date_col='date'):
     df = df.reset_index(drop=True)
     df[date_col] = pd.to_datetime(df[date_col])  # Convert date columns to datetime
@@ -62,7 +76,7 @@ def clean_transform(df, date_col='date'):
     for col in df.columns:
         if col not in [date_col, 'symbol']:
             df[col] = pd.to_numeric(df[col], errors='coerce')  # Convert numerical columns
-    
+
     # Rename columns to match your database schema
     df = df.rename(columns={
         'index': 'date',
@@ -76,34 +90,87 @@ def clean_transform(df, date_col='date'):
     df = df.drop_duplicates()
     return df
 
-daily_df = clean_transform(daily_df)
-
-# Database configuration
-db_config = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'port': os.getenv('DB_PORT'),
-    'database': os.getenv('DB_NAME')
-}
-ca_cert_path = os.getenv('CA_CERT_PATH')
-
-# Create SQLAlchemy engine to connect to Aiven MySQL Database with SSL
-connection_string = (
-    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
-    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
-    f"ssl_verify_cert=true&ssl_ca={ca_cert_path}"
+def to_frame(daily_data):
+    return clean_transform(json_to_dataframe([daily_data], 'Time Series (Daily)', '2. Symbol'))
+
+# Fetch every symbol concurrently with the smallest window that covers its gap
+watermarks = get_watermarks()
+outputsizes = {symbol: choose_outputsize(watermarks.get(symbol)) for symbol in symbols}
+results = fetch_all({symbol: daily_params(symbol, outputsizes[symbol]) for symbol in symbols}, api_key)
+
+frames = {}
+gaps = []
+for symbol, daily_data in results.items():
+    if not daily_data:
+        continue
+    df = to_frame(daily_data)
+    last_date = watermarks.get(symbol)
+    # A compact window that starts after the watermark means days are missing, so backfill from full history
+    if outputsizes[symbol] == 'compact' and not df.empty and df['date'].min() > last_date:
+        print(f"Gap detected for {symbol} after {last_date.date()}, fetching full history.")
+        gaps.append(symbol)
+        continue
+    frames[symbol] = df
+
+if gaps:
+    gap_results = fetch_all({symbol: daily_params(symbol, 'full') for symbol in gaps}, api_key)
+    for symbol, daily_data in gap_results.items():
+        if daily_data:
+            frames[symbol] = to_frame(daily_data)
+    results.update(gap_results)
+
+failed = failed_keys(results)
+
+# Keep only the rows newer than each symbol's watermark
+new_rows = []
+for symbol, df in frames.items():
+    last_date = watermarks.get(symbol)
+    if not df.empty and last_date is not None:
+        df = df[df['date'] > last_date]
+    if not df.empty:
+        new_rows.append(df)
+
+daily_df = pd.concat(new_rows, ignore_index=True) if new_rows else pd.DataFrame()
+
+# Prepare the SQL UPSERT query on the unique_symbol_date key
+columns = ['symbol', 'date', 'open', 'high', 'low', 'close', 'volume']
+insert_query = """
+    INSERT INTO daily_data ({columns}) VALUES ({values})
+    ON DUPLICATE KEY UPDATE {updates}
+"""
+final_query = insert_query.format(
+    columns=', '.join(columns),
+    values=', '.join(['%s'] * len(columns)),
+    updates=', '.join([f"{col} = VALUES({col})" for col in columns if col not in ('symbol', 'date')])
 )
-engine = create_engine(connection_string)
 
-# Truncate the table and insert data
-try:
-    with engine.connect() as connection:
-        # Truncate the table
-        connection.execute(text("TRUNCATE TABLE daily_data"))
-        
-        # Insert the DataFrame into the table
-        daily_df.to_sql('daily_data', con=engine, if_exists='append', index=False)
-        print("Data successfully inserted into the daily_data table.")
-except Exception as e:
-    print(f"Failed to truncate and insert data into MySQL table: {e}")
\ No newline at end of file
+if daily_df.empty:
+    print("daily_data is already up to date.")
+else:
+    # Convert DataFrame to list of tuples with plain Python values
+    daily_df['date'] = daily_df['date'].dt.date
+    upsert_df = daily_df[columns].astype(object).where(daily_df[columns].notna(), None)
+    data_tuples = [tuple(row) for row in upsert_df.to_numpy()]
+
+    conn = engine.raw_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(final_query, data_tuples)
+        # Record the run; the dashboard keys its caches on the latest one
+        cursor.execute(
+            "INSERT INTO ingestion_runs (job, finished_at) VALUES (%s, UTC_TIMESTAMP()) "
+            "ON DUPLICATE KEY UPDATE finished_at = VALUES(finished_at)", ('daily_data',))
+        conn.commit()
+        print(f"Upserted {len(data_tuples)} new rows into the daily_data table.")
+    except Exception as e:
+        # Nothing is stored, so the next run starts again from the same watermarks
+        conn.rollback()
+        print(f"Failed to upsert data into MySQL table: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+if failed:
+    print(f"Failed to fetch daily data for: {', '.join(failed)}")
+    sys.exit(1)
@@ -0,0 +1,123 @@
+# fetch_engine.py
+# Shared Alpha Vantage fetch engine used by every scheduled_update_database job
+
+import os
+import re
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = 'https://www.alphavantage.co/query'
+
+# Quota and concurrency settings (override through the environment)
+CALLS_PER_MINUTE = float(os.getenv('ALPHA_VANTAGE_CALLS_PER_MINUTE', 5))
+MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', 4))
+MAX_RETRIES = int(os.getenv('FETCH_MAX_RETRIES', 5))
+BACKOFF_SECONDS = float(os.getenv('FETCH_BACKOFF_SECONDS', 15))
+REQUEST_TIMEOUT = float(os.getenv('FETCH_TIMEOUT_SECONDS', 30))
+
+# Response keys Alpha Vantage uses for notices. 'Note' is always the per-minute quota;
+# 'Information' is also used for premium-only endpoints and invalid keys, which retrying
+# cannot fix, so it only counts as a throttle when the message is about the rate limit.
+THROTTLE_KEYS = ('Note', 'Information')
+RATE_LIMIT_MESSAGE = re.compile(r'call frequency|rate limit|(calls|requests) per (minute|day)', re.IGNORECASE)
+
+
+# Token bucket that spaces calls out to the per-minute quota
+class TokenBucket:
+    def __init__(self, rate_per_minute, capacity=1):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# One limiter per API key, shared by every job running in this process
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(api_key):
+    with _limiters_lock:
+        if api_key not in _limiters:
+            _limiters[api_key] = TokenBucket(CALLS_PER_MINUTE)
+        return _limiters[api_key]
+
+
+# Pooled HTTP session that retries connection errors and 5xx responses
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=retry)
+            _session = requests.Session()
+            _session.mount('https://', adapter)
+        return _session
+
+
+# Function to fetch one API call, retrying with backoff when the quota note comes back
+def fetch_data(params, api_key):
+    params = dict(params, apikey=api_key)
+    limiter = get_limiter(api_key)
+    label = f"{params.get('function')} {params.get('symbol', '')}".strip()
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            response = get_session().get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Request failed for {label}: {e}")
+            return None
+
+        if "Error Message" in data:
+            print(f"Error fetching data for {label}: {data['Error Message']}")
+            return None
+
+        throttle_key = next((key for key in THROTTLE_KEYS if key in data), None)
+        if throttle_key is None:
+            return data
+        if throttle_key == 'Information' and not RATE_LIMIT_MESSAGE.search(str(data[throttle_key])):
+            print(f"Error fetching data for {label}: {data[throttle_key]}")
+            return None
+
+        if attempt < MAX_RETRIES:
+            wait = BACKOFF_SECONDS * (2 ** attempt)
+            print(f"Throttled on {label}, retrying in {wait:.0f}s: {data[throttle_key]}")
+            time.sleep(wait)
+
+    print(f"Giving up on {label} after {MAX_RETRIES} retries.")
+    return None
+
+
+# Function to fetch many calls concurrently; returns {key: data or None}
+def fetch_all(params_by_key, api_key):
+    keys = list(params_by_key)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(lambda key: fetch_data(params_by_key[key], api_key), keys)
+        return dict(zip(keys, results))
+
+
+# Function to list the keys whose fetch failed so jobs can report them
+def failed_keys(results):
+    return [key for key, data in results.items() if data is None]
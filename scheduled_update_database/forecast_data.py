@@ -0,0 +1,173 @@
+# forecast_data.py
+# Offline forecast stage: after ingestion, computes the 30-day LSTM forecast, the
+# in-sample (Actual vs Predicted) predictions and the MAE/MSE for every symbol and
+# stores them so the Financial Scores page only has to read them.
+# The in-sample predictions are kept per model version: each run only predicts the
+# days that version has not seen yet and adds their errors to running sums.
+
+import os
+import sys
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, text, bindparam
+
+# The models and forecasting code live with the web app
+web_app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web_app')
+sys.path.insert(0, web_app_dir)
+from forecasting import rollout_many
+from windowing import create_dataset, predict_windows
+from model_bundle import MinMaxScaling, bundle_path, load_bundle
+
+symbols = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
+models_dir = os.getenv('MODELS_DIR', web_app_dir)
+time_step = 60
+horizon = 30
+
+# Database configuration
+db_config = {
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'host': os.getenv('DB_HOST'),
+    'port': os.getenv('DB_PORT'),
+    'database': os.getenv('DB_NAME')
+}
+ca_cert_path = os.getenv('CA_CERT_PATH')
+
+# Create SQLAlchemy engine to connect to Aiven MySQL Database with SSL
+connection_string = (
+    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
+    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+    f"ssl_verify_cert=true&ssl_ca={ca_cert_path}"
+)
+engine = create_engine(connection_string)
+
+# Same rows the dashboard models are trained and served on (days that have indicators)
+closes_query = text("""
+    SELECT d.symbol, d.date, d.close
+    FROM daily_data d
+    JOIN technical_indicators t ON t.symbol = d.symbol AND t.date = d.date
+    WHERE d.symbol IN :symbols
+    ORDER BY d.symbol, d.date
+""").bindparams(bindparam('symbols', expanding=True))
+
+with engine.connect() as connection:
+    closes_df = pd.read_sql(closes_query, connection, params={'symbols': symbols})
+closes_df['date'] = pd.to_datetime(closes_df['date'])
+
+# Function to load a symbol's model, scaling, type and version from its live bundle
+def load_symbol_model(symbol, closes):
+    bundle = bundle_path(models_dir, symbol)
+    if bundle is None:
+        return None
+    loaded = load_bundle(bundle)
+    if loaded.scaling is not None:
+        return loaded.model, loaded.scaling, loaded.model_type, loaded.version
+    # Converted model without a training-time scaler: fitted on the current history. The scaler
+    # is then part of the version, since earlier predictions no longer apply when it changes.
+    scaling = MinMaxScaling.fit(closes)
+    digest = hashlib.sha256(f"{scaling.data_min!r}:{scaling.data_max!r}".encode()).hexdigest()[:8]
+    return loaded.model, scaling, loaded.model_type, f"{loaded.version}-{digest}"
+
+# Running error sums per (symbol, model version)
+stats_query = text("""
+    SELECT symbol, model_version, n_predictions, sum_abs_error, sum_sq_error, last_date, generated_at
+    FROM lstm_metrics WHERE symbol IN :symbols ORDER BY generated_at
+""").bindparams(bindparam('symbols', expanding=True))
+with engine.connect() as connection:
+    stats_df = pd.read_sql(stats_query, connection, params={'symbols': symbols})
+stats = {(row.symbol, row.model_version): row for row in stats_df.itertuples(index=False)}
+
+models, model_types, scalers, versions, histories, last_windows = {}, {}, {}, {}, {}, {}
+for symbol, group in closes_df.groupby('symbol'):
+    loaded = load_symbol_model(symbol, group['close']) if len(group) > time_step else None
+    if loaded is None:
+        print(f"Skipping {symbol}: no model or not enough history.")
+        continue
+    models[symbol], scalers[symbol], model_types[symbol], versions[symbol] = loaded
+    scaled = scalers[symbol].transform(group['close'].to_numpy())
+    histories[symbol] = (group, scaled)
+    last_windows[symbol] = scaled[-time_step:]
+
+# 30-day forecasts for every symbol in one batched rollout (one pass for direct models)
+forecasts = rollout_many(models, last_windows, horizon=horizon, model_types=model_types)
+
+generated_at = datetime.now(timezone.utc).replace(tzinfo=None)
+forecast_rows, backtest_rows, metric_rows = [], [], []
+for symbol, model in models.items():
+    group, scaled = histories[symbol]
+    scaler = scalers[symbol]
+    version = versions[symbol]
+
+    future_prices = scaler.inverse_transform(forecasts[symbol])
+    future_dates = pd.date_range(start=group['date'].iloc[-1] + pd.Timedelta(days=1), periods=horizon)
+    forecast_rows += [(symbol, d.date(), float(p), generated_at) for d, p in zip(future_dates, future_prices)]
+
+    # In-sample predictions only for the windows this model version has not predicted yet
+    X, y = create_dataset(scaled, time_step)
+    target_dates = group['date'].iloc[time_step:].dt.date.to_numpy()
+    previous = stats.get((symbol, version))
+    new = np.flatnonzero(target_dates > previous.last_date) if previous is not None else np.arange(len(X))
+    if len(new) == 0:
+        continue
+    y_pred = predict_windows(model.predict_on_batch, X[new])[:, 0]  # Next-day prediction (first output of direct models)
+    y_pred_rescaled = scaler.inverse_transform(y_pred)
+    y_actual_rescaled = scaler.inverse_transform(y[new])
+    backtest_rows += [(symbol, version, d, float(a), float(p))
+                      for d, a, p in zip(target_dates[new], y_actual_rescaled, y_pred_rescaled)]
+
+    errors = y_actual_rescaled - y_pred_rescaled
+    metric_rows.append((
+        symbol, version,
+        (previous.n_predictions if previous is not None else 0) + len(new),
+        (previous.sum_abs_error if previous is not None else 0.0) + float(np.abs(errors).sum()),
+        (previous.sum_sq_error if previous is not None else 0.0) + float(np.square(errors).sum()),
+        target_dates[new[-1]],
+        generated_at,
+    ))
+
+# Only the current model version and the one before it are kept per symbol; the previous
+# version is the most recently evaluated other one (stats_df is ordered by generated_at)
+kept_versions = {symbol: (version, version) for symbol, version in versions.items()}
+for row in stats_df.itertuples(index=False):
+    if row.symbol in versions and row.model_version != versions[row.symbol]:
+        kept_versions[row.symbol] = (versions[row.symbol], row.model_version)
+prune_rows = [(symbol,) + kept for symbol, kept in kept_versions.items()]
+
+# Replace each symbol's results in one transaction so the page never sees a mix of runs
+conn = engine.raw_connection()
+try:
+    cursor = conn.cursor()
+    cursor.executemany("DELETE FROM lstm_forecasts WHERE symbol = %s", [(symbol,) for symbol in models])
+    cursor.executemany(
+        "INSERT INTO lstm_forecasts (symbol, date, predicted_close, generated_at) VALUES (%s, %s, %s, %s)",
+        forecast_rows)
+    # New predictions and the updated sums go in together, so a rerun never counts a day twice
+    cursor.executemany(
+        """INSERT INTO lstm_backtest (symbol, model_version, date, actual_close, predicted_close) VALUES (%s, %s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE actual_close = VALUES(actual_close), predicted_close = VALUES(predicted_close)""",
+        backtest_rows)
+    cursor.executemany(
+        """INSERT INTO lstm_metrics (symbol, model_version, n_predictions, sum_abs_error, sum_sq_error, last_date, generated_at)
+           VALUES (%s, %s, %s, %s, %s, %s, %s)
+           ON DUPLICATE KEY UPDATE n_predictions = VALUES(n_predictions), sum_abs_error = VALUES(sum_abs_error),
+               sum_sq_error = VALUES(sum_sq_error), last_date = VALUES(last_date), generated_at = VALUES(generated_at)""",
+        metric_rows)
+    cursor.executemany(
+        "DELETE FROM lstm_backtest WHERE symbol = %s AND model_version NOT IN (%s, %s)", prune_rows)
+    cursor.executemany(
+        "DELETE FROM lstm_metrics WHERE symbol = %s AND model_version NOT IN (%s, %s)", prune_rows)
+    # Record the run; the dashboard keys its caches on the latest one
+    cursor.execute(
+        "INSERT INTO ingestion_runs (job, finished_at) VALUES (%s, UTC_TIMESTAMP()) "
+        "ON DUPLICATE KEY UPDATE finished_at = VALUES(finished_at)", ('forecast_data',))
+    conn.commit()
+    print(f"Stored forecasts for {', '.join(models)} and {len(backtest_rows)} new in-sample predictions.")
+except Exception as e:
+    conn.rollback()
+    print(f"Failed to store forecasts in MySQL: {e}")
+    sys.exit(1)
+finally:
+    cursor.close()
+    conn.close()
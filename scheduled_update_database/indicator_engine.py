@@ -0,0 +1,123 @@
+# indicator_engine.py
+# Computes technical indicators locally from the stored daily closes.
+# Full history is computed for all symbols in one grouped pandas pass; after that
+# each symbol keeps a small state (SMA window, last EMA, Wilder averages) so a new
+# day is folded in with O(1) work.
+
+import os
+import numpy as np
+import pandas as pd
+
+# Output column, indicator kind and period (periods can be overridden through the environment)
+INDICATOR_SPECS = [
+    {'column': 'sma', 'kind': 'sma', 'period': int(os.getenv('SMA_PERIOD', 10))},
+    {'column': 'ema', 'kind': 'ema', 'period': int(os.getenv('EMA_PERIOD', 10))},
+    {'column': 'rsi', 'kind': 'rsi', 'period': int(os.getenv('RSI_PERIOD', 14))},
+]
+
+
+# Function to apply a recursive smoothing seeded with the simple mean of the first `period` values
+def _seeded_ewm(values, period, alpha):
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seeded = pd.Series(values[period - 1:], dtype=float)
+    seeded.iloc[0] = np.mean(values[:period])
+    out[period - 1:] = seeded.ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+# Function to compute Wilder's average gain and loss for one symbol's closes
+def _wilder_averages(closes, period):
+    avg_gain = np.full(len(closes), np.nan)
+    avg_loss = np.full(len(closes), np.nan)
+    if len(closes) > period:
+        delta = np.diff(closes)
+        avg_gain[1:] = _seeded_ewm(np.clip(delta, 0, None), period, 1.0 / period)
+        avg_loss[1:] = _seeded_ewm(np.clip(-delta, 0, None), period, 1.0 / period)
+    return avg_gain, avg_loss
+
+def _rsi(avg_gain, avg_loss):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    return np.where(avg_loss == 0, 100.0, rsi)
+
+def _indicator_values(closes, spec):
+    period = spec['period']
+    if spec['kind'] == 'sma':
+        return pd.Series(closes).rolling(period).mean().to_numpy()
+    if spec['kind'] == 'ema':
+        return _seeded_ewm(closes, period, 2.0 / (period + 1))
+    if spec['kind'] == 'rsi':
+        return _rsi(*_wilder_averages(closes, period))
+    raise ValueError(f"Unknown indicator kind: {spec['kind']}")
+
+
+# Function to compute every indicator for all symbols in one grouped pass
+# Expects columns symbol, date, close; returns symbol, date and one column per spec
+def compute_indicators(daily_df, specs=INDICATOR_SPECS):
+    df = daily_df[['symbol', 'date', 'close']].sort_values(['symbol', 'date']).reset_index(drop=True)
+    closes = df.groupby('symbol', sort=False)['close']
+    result = df[['symbol', 'date']].copy()
+    for spec in specs:
+        result[spec['column']] = closes.transform(lambda s: pd.Series(_indicator_values(s.to_numpy(dtype=float), spec), index=s.index))
+    return result
+
+
+# Function to build the incremental state of each symbol from its full history
+# Symbols with too little history get no state and are recomputed in full next run
+def build_states(daily_df, specs=INDICATOR_SPECS):
+    states = {}
+    min_rows = max(spec['period'] for spec in specs) + 1
+    df = daily_df[['symbol', 'date', 'close']].sort_values(['symbol', 'date'])
+    for symbol, group in df.groupby('symbol', sort=False):
+        closes = group['close'].to_numpy(dtype=float)
+        if len(closes) < min_rows:
+            continue
+        indicators = {}
+        for spec in specs:
+            period = spec['period']
+            if spec['kind'] == 'sma':
+                window = closes[-period:].tolist()
+                indicators[spec['column']] = {'window': window, 'sum': float(np.sum(window))}
+            elif spec['kind'] == 'ema':
+                indicators[spec['column']] = {'value': float(_seeded_ewm(closes, period, 2.0 / (period + 1))[-1])}
+            elif spec['kind'] == 'rsi':
+                avg_gain, avg_loss = _wilder_averages(closes, period)
+                indicators[spec['column']] = {'avg_gain': float(avg_gain[-1]), 'avg_loss': float(avg_loss[-1])}
+        states[symbol] = {
+            'specs': specs,
+            'last_date': pd.Timestamp(group['date'].iloc[-1]).strftime('%Y-%m-%d'),
+            'last_close': float(closes[-1]),
+            'indicators': indicators,
+        }
+    return states
+
+
+# Function to fold one new daily close into a symbol's state; returns the indicator values for that day
+def step(state, date, close):
+    close = float(close)
+    change = close - state['last_close']
+    values = {}
+    for spec in state['specs']:
+        column, period = spec['column'], spec['period']
+        ind = state['indicators'][column]
+        if spec['kind'] == 'sma':
+            ind['sum'] += close - ind['window'].pop(0)
+            ind['window'].append(close)
+            values[column] = ind['sum'] / period
+        elif spec['kind'] == 'ema':
+            alpha = 2.0 / (period + 1)
+            ind['value'] = alpha * close + (1 - alpha) * ind['value']
+            values[column] = ind['value']
+        elif spec['kind'] == 'rsi':
+            ind['avg_gain'] = (ind['avg_gain'] * (period - 1) + max(change, 0.0)) / period
+            ind['avg_loss'] = (ind['avg_loss'] * (period - 1) + max(-change, 0.0)) / period
+            values[column] = float(_rsi(np.float64(ind['avg_gain']), np.float64(ind['avg_loss'])))
+    state['last_close'] = close
+    state['last_date'] = pd.Timestamp(date).strftime('%Y-%m-%d')
+    return values
+
+
+# Function to check a stored state still matches the configured indicators
+def state_matches(state, specs=INDICATOR_SPECS):
+    return state is not None and state.get('specs') == specs
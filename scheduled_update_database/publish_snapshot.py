@@ -0,0 +1,96 @@
+# publish_snapshot.py
+# Publishes a versioned, columnar (Arrow IPC) snapshot of the joined daily, indicator
+# and company data for the dashboard to memory-map instead of querying MySQL.
+#
+# Layout under SNAPSHOT_DIR:
+#   CURRENT                                  -> name of the live version, swapped atomically
+#   <version>/company_data.arrow
+#   <version>/daily/symbol=<SYMBOL>.arrow    -> daily bars left-joined with indicators
+
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from datetime import datetime, timezone
+from sqlalchemy import create_engine
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR')
+KEEP_VERSIONS = int(os.getenv('SNAPSHOT_KEEP_VERSIONS', 3))
+
+# The web app only reads a snapshot when SNAPSHOT_DIR is set, so there is nothing to publish otherwise
+if not SNAPSHOT_DIR:
+    print("SNAPSHOT_DIR is not set; skipping the snapshot.")
+    sys.exit(0)
+
+# Database configuration
+db_config = {
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'host': os.getenv('DB_HOST'),
+    'port': os.getenv('DB_PORT'),
+    'database': os.getenv('DB_NAME')
+}
+ca_cert_path = os.getenv('CA_CERT_PATH')
+
+# Create SQLAlchemy engine to connect to Aiven MySQL Database with SSL
+connection_string = (
+    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
+    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+    f"ssl_verify_cert=true&ssl_ca={ca_cert_path}"
+)
+engine = create_engine(connection_string)
+
+daily_query = """
+    SELECT d.symbol, d.date, d.open, d.high, d.low, d.close, d.volume, t.sma, t.ema, t.rsi
+    FROM daily_data d
+    LEFT JOIN technical_indicators t ON t.symbol = d.symbol AND t.date = d.date
+    ORDER BY d.symbol, d.date
+"""
+
+# Function to write a DataFrame as an uncompressed Arrow file so readers can memory-map it
+def write_arrow(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, path, compression='uncompressed')
+
+# Function to point CURRENT at a version without readers ever seeing a partial file
+def set_current(version):
+    fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, prefix='.CURRENT-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(SNAPSHOT_DIR, 'CURRENT'))
+
+# Function to remove all but the newest versions (older ones may still be mapped by running readers)
+def prune_versions():
+    versions = sorted(name for name in os.listdir(SNAPSHOT_DIR) if name.startswith('v'))
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+
+with engine.connect() as connection:
+    companies_df = pd.read_sql('SELECT * FROM company_data', connection)
+    daily_df = pd.read_sql(daily_query, connection)
+
+daily_df['date'] = pd.to_datetime(daily_df['date'])
+for col in ['sma', 'ema', 'rsi']:
+    daily_df[col] = daily_df[col].astype(float)  # DECIMAL columns come back as Python Decimals
+
+os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+version = 'v' + datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')
+
+# Build the whole version in a hidden staging directory, then rename it into place
+staging_dir = tempfile.mkdtemp(dir=SNAPSHOT_DIR, prefix='.staging-')
+try:
+    os.makedirs(os.path.join(staging_dir, 'daily'))
+    write_arrow(companies_df, os.path.join(staging_dir, 'company_data.arrow'))
+    for symbol, group in daily_df.groupby('symbol'):
+        write_arrow(group.reset_index(drop=True), os.path.join(staging_dir, 'daily', f'symbol={symbol}.arrow'))
+    os.rename(staging_dir, os.path.join(SNAPSHOT_DIR, version))
+except Exception as e:
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    raise SystemExit(f"Failed to publish snapshot: {e}")
+
+set_current(version)
+prune_versions()
+print(f"Published snapshot {version} with {daily_df['symbol'].nunique()} symbols to {SNAPSHOT_DIR}.")
@@ -0,0 +1,43 @@
+# run_all.py
+# Runs every scheduled_update_database job in parallel in one process so they share
+# the fetch engine's pooled session and per-key rate limiters
+
+import os
+import sys
+import runpy
+from concurrent.futures import ThreadPoolExecutor
+
+# Jobs in the same stage run in parallel; technical_indicators is computed from daily_data,
+# the forecasts and scores once the data is written, and the dashboard snapshot last
+# (the dashboard keys its caches on the snapshot version)
+stages = [
+    ['company_data.py', 'daily_data.py'],
+    ['technical_indicators.py'],
+    ['forecast_data.py', 'score_data.py'],
+    ['publish_snapshot.py'],
+]
+jobs_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Function to run one job script, returning True when it finished cleanly
+def run_job(job):
+    try:
+        runpy.run_path(os.path.join(jobs_dir, job), run_name='__main__')
+        return True
+    except SystemExit as e:
+        return not e.code
+    except Exception as e:
+        print(f"{job} failed: {e}")
+        return False
+
+if __name__ == '__main__':
+    sys.path.insert(0, jobs_dir)
+    succeeded = {}
+    for jobs in stages:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            succeeded.update(zip(jobs, executor.map(run_job, jobs)))
+
+    failed_jobs = [job for job, ok in succeeded.items() if not ok]
+    if failed_jobs:
+        print(f"Jobs with errors: {', '.join(failed_jobs)}")
+        sys.exit(1)
+    print("All jobs finished successfully.")
@@ -0,0 +1,131 @@
+# score_data.py
+# Extends the stored investment-score series nightly. Each symbol keeps a checkpointed
+# ScoreState (ring buffers and running sums), so only the new days are processed;
+# symbols without a checkpoint are scored in full with the vectorized engine.
+
+import os
+import sys
+import json
+import pandas as pd
+from sqlalchemy import create_engine, text, bindparam
+
+# The scoring engine lives with the web app
+web_app_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'web_app')
+sys.path.insert(0, web_app_dir)
+from scoring import ScoreState, compute_scores
+
+symbols = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
+score_columns = ['price_momentum', 'volatility_score', 'volume_score', 'ema_sma_score',
+                 'rsi_score', 'investment_score', 'signal']
+
+# Database configuration
+db_config = {
+    'user': os.getenv('DB_USER'),
+    'password': os.getenv('DB_PASSWORD'),
+    'host': os.getenv('DB_HOST'),
+    'port': os.getenv('DB_PORT'),
+    'database': os.getenv('DB_NAME')
+}
+ca_cert_path = os.getenv('CA_CERT_PATH')
+
+# Create SQLAlchemy engine to connect to Aiven MySQL Database with SSL
+connection_string = (
+    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@"
+    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+    f"ssl_verify_cert=true&ssl_ca={ca_cert_path}"
+)
+engine = create_engine(connection_string)
+
+# Function to load the checkpointed state of each symbol
+def load_states():
+    query = text("SELECT symbol, state FROM score_state WHERE symbol IN :symbols").bindparams(bindparam('symbols', expanding=True))
+    with engine.connect() as connection:
+        rows = connection.execute(query, {'symbols': symbols}).fetchall()
+    return {row[0]: ScoreState.from_dict(json.loads(row[1]) if isinstance(row[1], (str, bytes)) else row[1]) for row in rows}
+
+# Function to load daily bars joined with indicators, optionally only after a date
+def load_bars(symbol_list, since=None):
+    query = text("""
+        SELECT d.symbol, d.date, d.close, d.high, d.low, d.volume, t.ema, t.rsi
+        FROM daily_data d
+        JOIN technical_indicators t ON t.symbol = d.symbol AND t.date = d.date
+        WHERE d.symbol IN :symbols AND d.date > :since
+        ORDER BY d.symbol, d.date
+    """).bindparams(bindparam('symbols', expanding=True))
+    with engine.connect() as connection:
+        df = pd.read_sql(query, connection, params={'symbols': symbol_list, 'since': since or pd.Timestamp('1900-01-01').date()})
+    df['date'] = pd.to_datetime(df['date'])
+    for col in ['ema', 'rsi']:
+        df[col] = df[col].astype(float)  # DECIMAL columns come back as Python Decimals
+    return df
+
+states = load_states()
+full = [symbol for symbol in symbols if symbol not in states]
+incremental = [symbol for symbol in symbols if symbol in states]
+frames = []
+
+# Symbols without a checkpoint: score the whole history in one vectorized pass
+if full:
+    history = load_bars(full)
+    if not history.empty:
+        frames.append(pd.concat([history[['symbol', 'date']], compute_scores(history)[score_columns]], axis=1))
+        for symbol, group in history.groupby('symbol'):
+            states[symbol] = ScoreState.from_history(group)
+
+# Symbols with a checkpoint: O(1) per new day
+if incremental:
+    since = min(states[symbol].last_date for symbol in incremental).date()
+    new_bars = load_bars(incremental, since)
+    rows = []
+    for bar in new_bars.to_dict('records'):
+        state = states[bar['symbol']]
+        if bar['date'] <= state.last_date:
+            continue
+        factors = state.update(bar)
+        rows.append({'symbol': bar['symbol'], 'date': bar['date'], **{col: factors[col] for col in score_columns}})
+    if rows:
+        frames.append(pd.DataFrame(rows))
+
+scores_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+if scores_df.empty:
+    print("investment_scores is already up to date.")
+else:
+    scores_df['date'] = scores_df['date'].dt.date
+    columns = ['symbol', 'date'] + score_columns
+    score_query = """
+        INSERT INTO investment_scores ({columns}) VALUES ({values})
+        ON DUPLICATE KEY UPDATE {updates}
+    """.format(
+        columns=', '.join(f"`{col}`" for col in columns),  # `signal` is a reserved word in MySQL
+        values=', '.join(['%s'] * len(columns)),
+        updates=', '.join([f"`{col}` = VALUES(`{col}`)" for col in score_columns])
+    )
+    upsert_df = scores_df[columns].astype(object).where(scores_df[columns].notna(), None)
+    data_tuples = [tuple(row) for row in upsert_df.to_numpy()]
+
+    state_query = """
+        INSERT INTO score_state (symbol, last_date, state) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE last_date = VALUES(last_date), state = VALUES(state)
+    """
+    state_tuples = [(symbol, state.last_date.date(), json.dumps(state.to_dict())) for symbol, state in states.items()]
+
+    # Scores and checkpoints are written together so a rerun never double-counts a day
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(score_query, data_tuples)
+        cursor.executemany(state_query, state_tuples)
+        # Record the run; the dashboard keys its caches on the latest one
+        cursor.execute(
+            "INSERT INTO ingestion_runs (job, finished_at) VALUES (%s, UTC_TIMESTAMP()) "
+            "ON DUPLICATE KEY UPDATE finished_at = VALUES(finished_at)", ('score_data',))
+        conn.commit()
+        print(f"Upserted {len(data_tuples)} rows into the investment_scores table.")
+    except Exception as e:
+        conn.rollback()
+        print(f"Failed to upsert data into MySQL table: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
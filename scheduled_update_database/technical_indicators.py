@@ -1,93 +1,13 @@
 import os
-import requests
+import sys
+import json
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, bindparam
+from indicator_engine import INDICATOR_SPECS, compute_indicators, build_states, step, state_matches
 
-# API Key and symbols
-api_key = os.getenv('API_KEY_technical_indicators')
+# Symbols
 symbols = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
 
-# Initialize lists to store all the JSON data
-all_sma_data = []
-all_ema_data = []
-all_rsi_data = []
-
-# Function to fetch data from a given API endpoint
-def fetch_data(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        if "Error Message" in data or "Note" in data:
-            print(f"Error fetching data: {data.get('Error Message', data.get('Note'))}")
-            return None
-        return data
-    except requests.exceptions.RequestException as e:
-        print(f"Request failed: {e}")
-        return None
-
-# Loop through each symbol and fetch the required data
-for symbol in symbols:
-    # Fetch SMA data
-    sma_url = f'https://www.alphavantage.co/query?function=SMA&symbol={symbol}&interval=daily&time_period=10&series_type=close&apikey={api_key}'
-    sma_data = fetch_data(sma_url)
-    if sma_data:
-        all_sma_data.append(sma_data)
-
-    # Fetch EMA data
-    ema_url = f'https://www.alphavantage.co/query?function=EMA&symbol={symbol}&interval=daily&time_period=10&series_type=close&apikey={api_key}'
-    ema_data = fetch_data(ema_url)
-    if ema_data:
-        all_ema_data.append(ema_data)
-
-    # Fetch RSI data
-    rsi_url = f'https://www.alphavantage.co/query?function=RSI&symbol={symbol}&interval=daily&time_period=14&series_type=close&apikey={api_key}'
-    rsi_data = fetch_data(rsi_url)
-    if rsi_data:
-        all_rsi_data.append(rsi_data)
-
-# Convert JSON data to DataFrame
-def json_to_dataframe(data_list, key, symbol_key):
-    frames = []
-    for data in data_list:
-        try:
-            meta_data = data['Meta Data']
-            symbol = meta_data[symbol_key]
-            time_series = data[key]
-
-            df = pd.DataFrame(time_series).transpose().reset_index()
-            df = df.rename(columns={'index': 'date'})
-            df['symbol'] = symbol
-            frames.append(df)
-        except KeyError as e:
-            print(f"KeyError: {e} in data: {data}")
-            continue
-    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
-
-# Convert and process SMA, EMA, and RSI data
-sma_df = json_to_dataframe(all_sma_data, 'Technical Analysis: SMA', '1: Symbol')
-ema_df = json_to_dataframe(all_ema_data, 'Technical Analysis: EMA', '1: Symbol')
-rsi_df = json_to_dataframe(all_rsi_data, 'Technical Analysis: RSI', '1: Symbol')
-
-# Clean and transform DataFrame
-def clean_transform(df, date_col='date'):
-    df = df.reset_index(drop=True)
-    df[date_col] = pd.to_datetime(df[date_col])
-    for col in df.columns:
-        if col not in [date_col, 'symbol']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    df = df.drop_duplicates()
-    return df
-
-sma_df = clean_transform(sma_df)
-ema_df = clean_transform(ema_df)
-rsi_df = clean_transform(rsi_df)
-
-# Combine all technical indicators into one DataFrame
-tech_indicators_df = pd.concat([sma_df, ema_df, rsi_df], axis=1)
-tech_indicators_df = tech_indicators_df.loc[:, ~tech_indicators_df.columns.duplicated()]
-tech_indicators_df = tech_indicators_df.fillna(0)
-
 # Database configuration
 db_config = {
     'user': os.getenv('DB_USER'),
@@ -106,13 +26,112 @@ connection_string = (
 )
 engine = create_engine(connection_string)
 
-# Truncate the technical_indicators table before inserting new data
-with engine.connect() as connection:
-    connection.execute(text("TRUNCATE TABLE technical_indicators"))
+indicator_columns = [spec['column'] for spec in INDICATOR_SPECS]
+
+# Function to check that technical_indicators has the unique (symbol, date) key the upsert
+# relies on; without it every run would append duplicate rows
+def has_symbol_date_key():
+    query = text("""
+        SELECT index_name, GROUP_CONCAT(column_name ORDER BY seq_in_index) AS key_columns
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'technical_indicators' AND non_unique = 0
+        GROUP BY index_name
+    """)
+    with engine.connect() as connection:
+        return any(row[1] == 'symbol,date' for row in connection.execute(query))
+
+if not has_symbol_date_key():
+    print("technical_indicators has no unique (symbol, date) key; "
+          "run Database/migrations/001_technical_indicators_unique_key.sql first.")
+    sys.exit(1)
+
+# Function to load the stored incremental state of each symbol
+def load_states():
+    query = text("SELECT symbol, state FROM indicator_state WHERE symbol IN :symbols").bindparams(bindparam('symbols', expanding=True))
+    with engine.connect() as connection:
+        rows = connection.execute(query, {'symbols': symbols}).fetchall()
+    return {row[0]: json.loads(row[1]) if isinstance(row[1], (str, bytes)) else row[1] for row in rows}
+
+# Function to load closes for the given symbols, optionally only after each symbol's last processed date
+def load_closes(symbol_list, after=None):
+    since = min(after.values()).date() if after else pd.Timestamp.min.date()
+    query = text(
+        "SELECT symbol, date, close FROM daily_data "
+        "WHERE symbol IN :symbols AND date > :since ORDER BY symbol, date"
+    ).bindparams(bindparam('symbols', expanding=True))
+    with engine.connect() as connection:
+        df = pd.read_sql(query, connection, params={'symbols': symbol_list, 'since': since})
+    df['date'] = pd.to_datetime(df['date'])
+    if after:
+        df = df[df['date'] > df['symbol'].map(after)]
+    return df
 
-# Insert the DataFrame into the technical_indicators table
-try:
-    tech_indicators_df.to_sql('technical_indicators', con=engine, if_exists='append', index=False)
-    print("Data successfully inserted into the technical_indicators table.")
-except Exception as e:
-    print(f"Failed to insert data into MySQL table: {e}")
\ No newline at end of file
+states = load_states()
+incremental = [symbol for symbol in symbols if state_matches(states.get(symbol))]
+full = [symbol for symbol in symbols if symbol not in incremental]
+frames = []
+
+# Full recompute for new symbols (or changed periods) in one grouped pass
+if full:
+    history = load_closes(full)
+    if not history.empty:
+        frames.append(compute_indicators(history))
+        states.update(build_states(history))
+
+# O(1) per new day for symbols that already have a state
+if incremental:
+    after = {symbol: pd.Timestamp(states[symbol]['last_date']) for symbol in incremental}
+    new_days = load_closes(incremental, after)
+    rows = []
+    for row in new_days.itertuples(index=False):
+        values = step(states[row.symbol], row.date, row.close)
+        rows.append({'symbol': row.symbol, 'date': row.date, **values})
+    if rows:
+        frames.append(pd.DataFrame(rows))
+
+tech_indicators_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+if tech_indicators_df.empty:
+    print("technical_indicators is already up to date.")
+else:
+    # Skip the warm-up days where an indicator is not defined yet
+    tech_indicators_df = tech_indicators_df.dropna(subset=indicator_columns)
+    tech_indicators_df['date'] = pd.to_datetime(tech_indicators_df['date']).dt.date
+
+    columns = ['symbol', 'date'] + indicator_columns
+    insert_query = """
+        INSERT INTO technical_indicators ({columns}) VALUES ({values})
+        ON DUPLICATE KEY UPDATE {updates}
+    """
+    final_query = insert_query.format(
+        columns=', '.join(columns),
+        values=', '.join(['%s'] * len(columns)),
+        updates=', '.join([f"{col} = VALUES({col})" for col in indicator_columns])
+    )
+    data_tuples = [tuple(row) for row in tech_indicators_df[columns].astype(object).to_numpy()]
+
+    state_query = """
+        INSERT INTO indicator_state (symbol, last_date, state) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE last_date = VALUES(last_date), state = VALUES(state)
+    """
+    state_tuples = [(symbol, state['last_date'], json.dumps(state)) for symbol, state in states.items()]
+
+    # Write indicators and states in one transaction so they never disagree
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(final_query, data_tuples)
+        cursor.executemany(state_query, state_tuples)
+        # Record the run; the dashboard keys its caches on the latest one
+        cursor.execute(
+            "INSERT INTO ingestion_runs (job, finished_at) VALUES (%s, UTC_TIMESTAMP()) "
+            "ON DUPLICATE KEY UPDATE finished_at = VALUES(finished_at)", ('technical_indicators',))
+        conn.commit()
+        print(f"Upserted {len(data_tuples)} rows into the technical_indicators table.")
+    except Exception as e:
+        conn.rollback()
+        print(f"Failed to upsert data into MySQL table: {e}")
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
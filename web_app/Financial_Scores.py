@@ -4,51 +4,40 @@ import pandas as pd
 import plotly.graph_objs as go
 import plotly.express as px
 import streamlit.components.v1 as components
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-import os
-
-# Define the path to the 'web_app' directory
-models_dir = 'web_app'
-
-def load_lstm_model(symbol):
-    model_path = os.path.join(models_dir, f'{symbol}_lstm_model.h5')
-    return load_model(model_path)
-
-@st.cache_data
-def create_dataset(data, time_step=60):
-    X, y = [], []
-    for i in range(len(data) - time_step):
-        X.append(data[i:(i + time_step), 0])
-        y.append(data[i + time_step, 0])
-    return np.array(X), np.array(y)
-
-@st.cache_data
-def predict_next_30_days(symbol, final_data):
-    company_data = final_data[final_data['symbol'] == symbol][['close']]
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(company_data)
-
-    time_step = 60
-    X, _ = create_dataset(scaled_data, time_step)
-    X = X.reshape(X.shape[0], X.shape[1], 1)
-
-    model = load_lstm_model(symbol)
+from data_access import (load_symbols, load_daily, load_forecast, load_backtest, load_model_metrics,
+                         load_investment_scores, get_data_version)
+from forecasting import forecast
+from model_cache import load_lstm_bundle
+from model_bundle import MinMaxScaling
+from windowing import create_dataset, predict_windows
+from scoring import DEFAULT_WEIGHTS, compute_scores
+from versioned_cache import versioned_cache
+
+# Columns the scores are computed from (days that have indicators, as the models were trained on)
+SCORE_COLUMNS = ('high', 'low', 'close', 'volume')
+SCORE_INDICATORS = ('sma', 'ema', 'rsi')
+
+def load_closes(symbol):
+    return load_daily(symbol, columns=('close',), indicators=SCORE_INDICATORS).set_index('date')[['close']]
+
+# Function to get a symbol's model, its scaling and type from its bundle: the training-time
+# scaler, or for converted models without one a scaler fitted on the current history
+def load_model_and_scaling(symbol, company_data):
+    bundle = load_lstm_bundle(symbol)
+    return bundle.model, bundle.scaling or MinMaxScaling.fit(company_data['close']), bundle.model_type
+
+@versioned_cache()
+def predict_next_30_days(symbol, data_version):
+    company_data = load_closes(symbol)
+    model, scaler, model_type = load_model_and_scaling(symbol, company_data)
 
     last_60_days = company_data[-60:].values
     last_60_days_scaled = scaler.transform(last_60_days)
-    X_future = np.array([last_60_days_scaled])
-    X_future = X_future.reshape(X_future.shape[0], X_future.shape[1], 1)
 
-    future_predictions = []
-    for _ in range(30):
-        pred_price = model.predict(X_future)
-        future_predictions.append(pred_price[0][0])
-        pred_price_reshaped = np.array([[[pred_price[0][0]]]])
-        X_future = np.append(X_future[:, 1:, :], pred_price_reshaped, axis=1)
-
-    future_predictions = scaler.inverse_transform(np.array(future_predictions).reshape(-1, 1))
+    # One pass for direct models, otherwise a compiled 30-step rollout over a preallocated window buffer
+    future_predictions = forecast(model, last_60_days_scaled.reshape(1, -1), horizon=30, model_type=model_type)[0]
+    future_predictions = scaler.inverse_transform(future_predictions.reshape(-1, 1))
 
     historical_dates = company_data.index[-60:]
     future_dates = pd.date_range(start=company_data.index[-1] + pd.Timedelta(days=1), periods=30)
@@ -61,53 +50,53 @@ def predict_next_30_days(symbol, final_data):
     
     return combined_df, historical_dates, future_dates, future_predictions
     
-@st.cache_data
-def calculate_moving_averages(df, window=50):
-    df[f'ma_{window}'] = df['close'].rolling(window=window).mean()
-    return df
-
-@st.cache_data
-def calculate_investment_scores(df):
-    df = calculate_moving_averages(df, 10)  # Short-term SAM
-    df = calculate_moving_averages(df, 50)  # Mid-term SAM
-    df = calculate_moving_averages(df, 200) # Long-term SAM
-    
-    df['price_momentum'] = (df['close'] - df['close'].shift(1)) / df['close'].shift(1) * 100
-    df['volatility_score'] = (df['high'] - df['low']) / df['close'] * 100
-    df['volume_score'] = (df['volume'] - df['volume'].rolling(window=50).mean()) / df['volume'].rolling(window=50).mean() * 100
-    df['ema_sma_score'] = df.apply(lambda row: 1 if row['ema'] > row['ma_50'] else -1, axis=1)
-    df['rsi_score'] = df['rsi'].apply(lambda x: 2 if x < 30 else (-2 if x > 70 else 0))
-    df['investment_score'] = 0.25 * df['price_momentum'] + \
-                            0.25 * df['volatility_score'] + \
-                            0.20 * df['volume_score'] + \
-                            0.20 * df['ema_sma_score'] + \
-                            0.10 * df['rsi_score']
-
-    return df
-
-@st.cache_data
-def generate_investment_signals(df):
-    df['signal'] = df['investment_score'].apply(lambda x: 'Buy' if x > 0 else ('Sell' if x < 0 else 'Hold'))
-    return df
-
-@st.cache_data
-def plot_investment_score_over_time(df, symbol):
+# Function to compute the in-sample predictions and error metrics live (used until the forecast job has run)
+@versioned_cache()
+def evaluate_model(symbol, data_version):
+    company_data = load_closes(symbol)
+    model, scaler, _ = load_model_and_scaling(symbol, company_data)
+    X_scaled = scaler.transform(company_data.values)
+    X, y = create_dataset(X_scaled, time_step=60)
+
+    y_pred = predict_windows(model.predict_on_batch, X)[:, :1]  # Next-day prediction (first output of direct models)
+    y_pred_rescaled = scaler.inverse_transform(y_pred.reshape(-1, 1))
+    y_actual_rescaled = scaler.inverse_transform(y.reshape(-1, 1))
+
+    mae = mean_absolute_error(y_actual_rescaled, y_pred_rescaled)
+    mse = mean_squared_error(y_actual_rescaled, y_pred_rescaled)
+    return y_actual_rescaled, y_pred_rescaled, mae, mse
+
+@versioned_cache()
+def calculate_investment_scores(symbol, data_version, weights=DEFAULT_WEIGHTS):
+    # Scores precomputed by the scheduled score job (default weights); computed here only until it has run
+    if weights == DEFAULT_WEIGHTS:
+        stored_df = load_investment_scores(symbol)
+        if not stored_df.empty:
+            return stored_df
+    # Factors, composite score and signal from the vectorized scoring engine
+    df = load_daily(symbol, columns=SCORE_COLUMNS, indicators=SCORE_INDICATORS)
+    return pd.concat([df, compute_scores(df, weights)], axis=1)
+
+@versioned_cache()
+def plot_investment_score_over_time(symbol, data_version):
+    df = calculate_investment_scores(symbol, data_version)
     fig = px.line(df, x='date', y='investment_score', title='Investment Score')
     return fig
 
-@st.cache_data
-def plot_signals(df, symbol):
+@versioned_cache()
+def plot_signals(symbol, data_version):
+    df = calculate_investment_scores(symbol, data_version)
     fig = px.scatter(df, x='date', y='investment_score', color='signal', title='Investment Signal')
     return fig
 
-def main(merged_df, final_data):
+def main():
     col1, col2 = st.columns([4, 2])
     with col2:
-        selected_company = st.selectbox('Select a company:', merged_df['symbol'].unique())
+        selected_company = st.selectbox('Select a company:', load_symbols())
 
-    company_data = merged_df[merged_df['symbol'] == selected_company]
-    company_data = calculate_investment_scores(company_data)
-    company_data = generate_investment_signals(company_data)
+    # Cached per (symbol, data version): nothing is recomputed or hashed until new data is ingested
+    data_version = get_data_version()
+    company_data = calculate_investment_scores(selected_company, data_version)
 
     with col1: 
         st.header(f"Investment Analysis for {selected_company}")
@@ -151,37 +140,42 @@ def main(merged_df, final_data):
 
     col5, col6 = st.columns([3,3])
     with col5:
-        st.plotly_chart(plot_investment_score_over_time(company_data, selected_company))
+        st.plotly_chart(plot_investment_score_over_time(selected_company, data_version))
 
     with col6:
-        st.plotly_chart(plot_signals(company_data, selected_company))
+        st.plotly_chart(plot_signals(selected_company, data_version))
 
     st.markdown('#')
 
     st.subheader(f"Next 30-Day Closing Stock Price Prediction using Machine Learning (LSTM)")
 
-    combined_data, historical_dates, future_dates, future_prices = predict_next_30_days(selected_company, final_data)
+    # Forecast precomputed by the scheduled forecast job; fall back to live inference until it has run
+    forecast_df = load_forecast(selected_company)
+    if not forecast_df.empty:
+        historical_dates = company_data['date'][-60:]
+        historical_prices = company_data['close'][-60:].to_numpy()
+        future_dates = forecast_df['date']
+        future_prices = forecast_df['predicted_close'].to_numpy()
+    else:
+        combined_data, historical_dates, future_dates, future_prices = predict_next_30_days(selected_company, data_version)
+        historical_prices = combined_data['close'][:60]
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(x=historical_dates, y=combined_data['close'][:60], mode='lines', name='Historical Prices'))
+    fig.add_trace(go.Scatter(x=historical_dates, y=historical_prices, mode='lines', name='Historical Prices'))
     fig.add_trace(go.Scatter(x=future_dates, y=future_prices.flatten(), mode='lines+markers', name='Predicted Prices'))
     fig.update_layout(
         title= f'{selected_company}',
         yaxis_title='Closing Price')         
     st.plotly_chart(fig)
 
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    X_scaled = scaler.fit_transform(final_data[final_data['symbol'] == selected_company][['close']])
-    X, y = create_dataset(X_scaled, time_step=60)
-
-    model = load_lstm_model(selected_company)
-    
-    y_pred = model.predict(X)
-    y_pred_rescaled = scaler.inverse_transform(y_pred.reshape(-1, 1))
-    y_actual_rescaled = scaler.inverse_transform(y.reshape(-1, 1))
-
-    mae = mean_absolute_error(y_actual_rescaled, y_pred_rescaled)
-    mse = mean_squared_error(y_actual_rescaled, y_pred_rescaled)
+    backtest_df = load_backtest(selected_company)
+    model_metrics = load_model_metrics(selected_company)
+    if not backtest_df.empty and model_metrics is not None:
+        y_actual_rescaled = backtest_df['actual_close'].to_numpy()
+        y_pred_rescaled = backtest_df['predicted_close'].to_numpy()
+        mae, mse = model_metrics['mae'], model_metrics['mse']
+    else:
+        y_actual_rescaled, y_pred_rescaled, mae, mse = evaluate_model(selected_company, data_version)
     
     st.markdown(
         """
@@ -286,7 +280,4 @@ def main(merged_df, final_data):
     components.html(html_content, height=800, scrolling=True)
 
 if __name__ == "__main__":
-    # Replace these with actual data when running the script
-    merged_df = pd.DataFrame() 
-    final_data = pd.DataFrame()  
-    main(merged_df, final_data)
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -2,65 +2,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.graph_objs as go
-from urllib.request import urlopen, Request
-import datetime
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from bs4 import BeautifulSoup
 import logging
+from news_cache import NEWS_TICKERS, get_news_cache
+from data_access import load_sentiment_daily, load_sentiment_state
+from sentiment_series import ROLLING_WINDOWS, decayed_means, rolling_sentiment
 
 # Set up logging
 logging.basicConfig(filename='app.log', level=logging.ERROR)
 
 def main():
-    st.cache_data
-    def scrape_and_analyze(tickers):
-        finviz_url = 'https://finviz.com/quote.ashx?t='
-        news_tables = {}
-
-        for ticker in tickers:
-            url = finviz_url + ticker
-            try:
-                req = Request(url=url, headers={'user-agent': 'my-app'})
-                response = urlopen(req)
-                html = BeautifulSoup(response, features='html.parser')
-                news_table = html.find(id='news-table')
-                news_tables[ticker] = news_table
-            except Exception as e:
-                logging.error(f"Error fetching data for ticker {ticker}: {e}")
-
-        parsed_data = []
-        for ticker, news_table in news_tables.items():
-            if news_table:
-                for row in news_table.findAll('tr'):
-                    try:
-                        link = row.find('a')
-                        if link is None:
-                            continue  # Skip rows without a link
-
-                        title = link.text
-                        news_url = link['href']
-                        date_td = row.find('td')
-                        date_data = date_td.text.split(' ') if date_td else []
-
-                        parsed_data.append([ticker, title, news_url])
-                    except Exception as e:
-                        logging.error(f"Error processing row for ticker {ticker}: {e}")
-
-        if parsed_data:
-            news_df = pd.DataFrame(parsed_data, columns=['ticker', 'title', 'url'])
-            analyzer = SentimentIntensityAnalyzer()
-            news_df['sentiment_score'] = news_df['title'].apply(lambda x: analyzer.polarity_scores(x)['compound'])
-            return news_df
-        else:
-            return None
-        
-    # Initialize session state for news data if not already present
-    if 'news_df' not in st.session_state:
-        st.session_state.news_df = scrape_and_analyze(['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL'])
+    # Scraped and scored by the process-wide refresher; reading the snapshot never waits on finviz
+    snapshot = get_news_cache().get()
 
-    tickers = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
+    tickers = NEWS_TICKERS
 
-    news_df = st.session_state.news_df
+    news_df = snapshot.news_df if snapshot is not None else None
 
     if news_df is not None and not news_df.empty:
         col1, col2 = st.columns([4,2])
@@ -81,7 +37,7 @@ def main():
             ""
                 
         with col3:
-            st.write(f"Last Updated: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}") 
+            st.write(f"Last Updated: {snapshot.updated_at.strftime('%Y-%m-%d %H:%M:%S')}")
 
         st.write("")
         st.write("")
@@ -155,6 +111,30 @@ def main():
 
         st.write("")
 
+        # Sentiment over time from the stored headlines (rolling means and exponential decays)
+        try:
+            sentiment_df = rolling_sentiment(load_sentiment_daily(selected_ticker))
+            decays = decayed_means(load_sentiment_state(selected_ticker))
+        except Exception as e:
+            logging.error(f"Error loading the sentiment series for {selected_ticker}: {e}")
+            sentiment_df, decays = None, {}
+
+        if sentiment_df is not None and not sentiment_df.empty:
+            st.subheader(f"Sentiment Over Time for {selected_ticker}")
+            decay_cols = st.columns(len(decays))
+            for col, (name, value) in zip(decay_cols, decays.items()):
+                col.metric(f"Decayed sentiment ({name} half-life)", "-" if pd.isna(value) else f"{value:.2f}")
+
+            recent_df = sentiment_df[sentiment_df['date'] >= sentiment_df['date'].max() - pd.Timedelta(days=90)]
+            fig_series = go.Figure()
+            for window in ROLLING_WINDOWS:
+                fig_series.add_trace(go.Scatter(x=recent_df['date'], y=recent_df[f'mean_{window}d'],
+                                                mode='lines', name=f'{window}-day mean', connectgaps=False))
+            fig_series.update_layout(title="Rolling Mean Sentiment", yaxis_title='Sentiment Score')
+            st.plotly_chart(fig_series, use_container_width=True)
+
+            st.write("")
+
     else:
         st.write("No news data available for the selected tickers.")
 
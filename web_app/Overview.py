@@ -1,25 +1,30 @@
 # overview.py
 import streamlit as st
-import pandas as pd
 import plotly.graph_objs as go
+from data_access import load_symbols, get_data_version
+from ohlc import RANGES, chart_bars
+from company_metrics import company_metrics
 
-st.cache_data
-def main (companies_df, daily_df):
+def main():
 
     # Create two columns with different proportions for title and select box
     col01, col02 = st.columns([4, 2])
 
     with col02:
         # The select box for selecting the company symbol
-        symbol = st.selectbox("Select Company", daily_df['symbol'].unique())
+        symbol = st.selectbox("Select Company", load_symbols())
 
     with col01:
         # Title that updates based on the selected company symbol
         st.title(f"{symbol}")
 
-    # Filter the data based on the selected symbol
-    filtered_df = daily_df[daily_df['symbol'] == symbol]
-    company_info = companies_df[companies_df['symbol'] == symbol].iloc[0]
+    # Load only the selected symbol's data; the profile and metrics come preformatted
+    data_version = get_data_version()
+    company_info, metrics_df = company_metrics(symbol, data_version)
+
+    # The visible range is chosen server-side; bars are aggregated so at most MAX_BARS are sent
+    range_label = st.radio("Range", list(RANGES), index=len(RANGES) - 1, horizontal=True)
+    filtered_df, level = chart_bars(symbol, data_version, range_label)
 
 
     # Create a candlestick plot with volume
@@ -37,7 +42,7 @@ def main (companies_df, daily_df):
 
     # Update layout for the candlestick chart and volume
     fig.update_layout(
-        title=f'Candlestick Chart for {symbol}',
+        title=f'Candlestick Chart for {symbol} ({level} bars)',
         yaxis_title='Price',
         yaxis2=dict(title='Volume', overlaying='y', side='right', showgrid=False),
         xaxis_rangeslider_visible=True,
@@ -45,17 +50,6 @@ def main (companies_df, daily_df):
         xaxis_rangeslider_bgcolor='white',
         xaxis_tickformat='%d %b %Y',  
         xaxis_tickangle=0,
-        xaxis_rangeselector=dict(
-            buttons=list([
-                dict(count=7, label='1w', step='day', stepmode='backward'),
-                dict(count=1, label='1m', step='month', stepmode='backward'),
-                dict(count=3, label='3m', step='month', stepmode='backward'),
-                dict(count=6, label='6m', step='month', stepmode='backward'),
-                dict(count=1, label='YTD', step='year', stepmode='todate'),
-                dict(count=1, label='1y', step='year', stepmode='backward'),
-                dict(step='all')
-            ])
-        ),
         yaxis2_showspikes=True, 
     )
 
@@ -80,47 +74,7 @@ def main (companies_df, daily_df):
     with col3:
         st.subheader("Financial Metrics")
 
-        # Define the metrics dictionary
-        metrics = {
-            "EBITDA": f"{company_info['EBITDA']}",
-            "P/E Ratio": f"{company_info['PERatio']}",
-            "PEG Ratio": f"{company_info['PEGRatio']}",
-            "Book Value": f"{company_info['BookValue']:}",
-            "Dividend Per Share": f"{company_info['DividendPerShare']}",
-            "Dividend Yield": f"{company_info['DividendYield']}",
-            "EPS": f"{company_info['EPS']}",
-            "Revenue Per Share (TTM)": f"{company_info['RevenuePerShareTTM']}",
-            "Profit Margin": f"{company_info['ProfitMargin']}",
-            "Operating Margin (TTM)": f"{company_info['OperatingMarginTTM']}",
-            "Return on Assets (TTM)": f"{company_info['ReturnOnAssetsTTM']}",
-            "Return on Equity (TTM)": f"{company_info['ReturnOnEquityTTM']}",
-            "Revenue (TTM)": f"{company_info['RevenueTTM']}",
-            "Gross Profit (TTM)": f"{company_info['GrossProfitTTM']}",
-            "Diluted EPS (TTM)": f"{company_info['DilutedEPSTTM']}",
-            "Quarterly Earnings Growth (YoY)": f"{company_info['QuarterlyEarningsGrowthYOY']}",
-            "Quarterly Revenue Growth (YoY)": f"{company_info['QuarterlyRevenueGrowthYOY']}",
-            "Analyst Target Price": f"${company_info['AnalystTargetPrice']}",
-            "Analyst Rating (Strong Buy)": f"{company_info['AnalystRatingStrongBuy']}",
-            "Analyst Rating (Buy)": f"{company_info['AnalystRatingBuy']}",
-            "Analyst Rating (Hold)": f"{company_info['AnalystRatingHold']}",
-            "Analyst Rating (Sell)": f"{company_info['AnalystRatingSell']}",
-            "Analyst Rating (Strong Sell)": f"{company_info['AnalystRatingStrongSell']}",
-            "Trailing P/E": f"{company_info['TrailingPE']}",
-            "Forward P/E": f"{company_info['ForwardPE']}",
-            "Price to Sales Ratio (TTM)": f"{company_info['PriceToSalesRatioTTM']}",
-            "Price to Book Ratio": f"{company_info['PriceToBookRatio']}",
-            "EV to Revenue": f"{company_info['EVToRevenue']}",
-            "EV to EBITDA": f"{company_info['EVToEBITDA']}",
-            "Beta": f"{company_info['Beta']}",
-            "52 Week High": f"${company_info['52WeekHigh']}",
-            "52 Week Low": f"${company_info['52WeekLow']}",
-            "50-Day Moving Avg": f"${company_info['50DayMovingAverage']}",
-            "200-Day Moving Avg": f"${company_info['200DayMovingAverage']}",
-        }
-
-    # Convert the metrics dictionary to a DataFrame and transpose it
-    metrics_df = pd.DataFrame(metrics.items(), columns=["Metric", "Value"])
-    st.dataframe(metrics_df, use_container_width=True, hide_index=True)
+        st.dataframe(metrics_df, use_container_width=True, hide_index=True)
 
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
+import os
 import streamlit as st
 from streamlit_option_menu import option_menu
-import pandas as pd
 from utils import footer
-from sqlalchemy import create_engine
+from model_cache import MODEL_WARMUP, get_model_cache
+from versioned_cache import cache_stats
+from data_access import get_pool_metrics
+from news_cache import news_cache_stats
 
+# Internal cache, pool and model statistics are only shown when enabled (e.g. for operators)
+SHOW_PERF_STATS = os.getenv('SHOW_PERF_STATS', '0') == '1'
 
 # Set page configuration
 st.set_page_config(
@@ -19,54 +24,18 @@ selected = option_menu(
     orientation="horizontal"
 )
 
-# Get the database credentials from Streamlit secrets
-db_config = st.secrets["connections"]["mysql"]
+# Start loading the LSTM models in the background when warm-up is enabled (runs once per process)
+if MODEL_WARMUP:
+    get_model_cache()
 
-# Create SQLAlchemy engine to connect to the MySQL Database
-connection_string = (
-    f"{db_config['dialect']}+mysqlconnector://{db_config['username']}:{db_config['password']}@"
-    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
-    f"charset={db_config['query']['charset']}"
-)
-
-# Create the SQLAlchemy engine
-engine = create_engine(connection_string)
-
-# Function to fetch data from the database
-@st.cache_data
-def fetch_data():
-    companies_query = 'SELECT * FROM company_data'
-    daily_data_query = 'SELECT * FROM daily_data'
-    technical_indicator_query = 'SELECT * FROM technical_indicators'
-    
-    # Execute queries and load data into DataFrames
-    with engine.connect() as connection:
-        companies_df = pd.read_sql(companies_query, connection)
-        daily_df = pd.read_sql(daily_data_query, connection)
-        technical_indicator_df = pd.read_sql(technical_indicator_query, connection)
-    
-    return companies_df, daily_df, technical_indicator_df
-
-# Fetch the latest data from the database
-companies_df, daily_df, technical_indicator_df = fetch_data()
-
-# Merge datasets if needed
-merged_df = pd.merge(daily_df, companies_df, on='symbol', how='inner')
-merged_df = pd.merge(merged_df, technical_indicator_df, on=['symbol', 'date'], how='inner')
-
-# Selecting relevant columns for the model
-final_data = merged_df[['date', 'symbol', 'high', 'low', 'close', 'volume', 'sma', 'ema', 'rsi']]
-final_data['date'] = pd.to_datetime(final_data['date'])
-final_data = final_data.set_index('date')
-
-# Load the selected page
+# Load the selected page; each page loads only the data it shows through data_access
 if selected == "Home":
     import Home
     Home.main()
 
 elif selected == "Overview":
     import Overview
-    Overview.main(companies_df, daily_df)
+    Overview.main()
 
 elif selected == "News & Sentiment":
     import News_Sentiment
@@ -74,6 +43,16 @@ elif selected == "News & Sentiment":
 
 elif selected == "Financial Scores":
     import Financial_Scores
-    Financial_Scores.main(merged_df, final_data)
+    Financial_Scores.main()
+
+# Hit/miss statistics of the shared caches and the connection pool
+if SHOW_PERF_STATS:
+    with st.sidebar.expander("Performance statistics"):
+        st.json({
+            'page_caches': cache_stats(),
+            'model_cache': get_model_cache().stats(),
+            'connection_pool': get_pool_metrics(),
+            'news_cache': news_cache_stats(),
+        })
 
 footer()
\ No newline at end of file
@@ -0,0 +1,88 @@
+# forecast_benchmark.py
+# Compares the recursive one-step LSTM (rolled forward HORIZON times) with the direct
+# multi-horizon LSTM: both are trained the same way on a synthetic price series, then
+# timed and scored (MAE per horizon, in price units) on the held-out tail.
+# Requires TensorFlow for training; inference is timed with the NumPy runtime the dashboard uses.
+#
+# Usage: python web_app/benchmarks/forecast_benchmark.py [--days 3000] [--epochs 10]
+#
+# Results with the defaults on one CPU core (NumPy runtime; MAE in price units, closes ~100):
+#   model        1 window  all windows   MAE d1  MAE d10  MAE d30  MAE mean
+#   recursive    150.27ms     5619.9ms    2.383    4.460   10.168     6.156
+#   direct         4.86ms      200.9ms    2.996    3.999    6.266     4.884
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sklearn.preprocessing import MinMaxScaler
+from create_lstm_model import TIME_STEP, create_lstm_model, build_windows
+from forecasting import HORIZON, forecast
+from lstm_runtime import LSTMRuntime, extract_layers
+from windowing import create_multi_horizon_dataset
+
+
+def synthetic_closes(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    trend = np.cumsum(rng.normal(0.0003, 0.015, n_days))
+    cycle = 0.05 * np.sin(np.arange(n_days) * 2 * np.pi / 60)
+    return 100 * np.exp(trend + cycle)
+
+def train(model_type, scaled, split, epochs, batch_size):
+    X, y = build_windows(scaled, model_type)
+    # Training windows must not see the test period
+    last_target = np.arange(len(X)) + TIME_STEP + (1 if y.ndim == 1 else y.shape[1]) - 1
+    train_rows = last_target < split
+    model = create_lstm_model((TIME_STEP, 1), outputs=1 if y.ndim == 1 else y.shape[1])
+    model.fit(X[train_rows][..., None], y[train_rows], epochs=epochs, batch_size=batch_size, verbose=0)
+    return model
+
+# Function to time a forecast call: median seconds over `repeats` runs
+def timed(fn, repeats):
+    durations = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started)
+    return float(np.median(durations))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=3000)
+    parser.add_argument('--test-fraction', type=float, default=0.2)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    closes = synthetic_closes(args.days)
+    split = int(args.days * (1 - args.test_fraction))
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled = scaler.fit_transform(closes[:split].reshape(-1, 1))[:, 0]
+    scaled = np.concatenate([scaled, scaler.transform(closes[split:].reshape(-1, 1))[:, 0]])
+
+    # Test origins: every window whose whole horizon lies in the test period
+    X_all, Y_all = create_multi_horizon_dataset(scaled, TIME_STEP, HORIZON)
+    test_rows = np.arange(len(X_all)) + TIME_STEP >= split
+    X_test, Y_test = X_all[test_rows], Y_all[test_rows]
+    actual = scaler.inverse_transform(Y_test.reshape(-1, 1)).reshape(Y_test.shape)
+
+    print(f"{args.days} days, {len(X_test)} test origins, horizon {HORIZON}, {args.epochs} epochs")
+    print(f"{'model':<10} {'1 window':>10} {'all windows':>12} {'MAE d1':>8} {'MAE d10':>8} {'MAE d30':>8} {'MAE mean':>9}")
+    for model_type in ('recursive', 'direct'):
+        runtime = LSTMRuntime(extract_layers(train(model_type, scaled, split, args.epochs, args.batch_size)))
+
+        single = timed(lambda: forecast(runtime, X_test[:1], HORIZON, model_type), args.repeats)
+        batch = timed(lambda: forecast(runtime, X_test, HORIZON, model_type), max(1, args.repeats // 10))
+
+        predicted = forecast(runtime, X_test, HORIZON, model_type)
+        predicted = scaler.inverse_transform(predicted.reshape(-1, 1)).reshape(predicted.shape)
+        mae = np.abs(predicted - actual).mean(axis=0)
+        print(f"{model_type:<10} {single * 1000:>8.2f}ms {batch * 1000:>10.1f}ms "
+              f"{mae[0]:>8.3f} {mae[9]:>8.3f} {mae[HORIZON - 1]:>8.3f} {mae.mean():>9.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# news_parse_benchmark.py
+# Parse throughput of the news-table backends on the recorded quote pages in fixtures/,
+# compared with the previous approach (BeautifulSoup over the whole page). Checks that
+# every backend extracts the same rows.
+#
+# Usage: python web_app/benchmarks/news_parse_benchmark.py [--repeats 50]
+
+import os
+import sys
+import glob
+import time
+import argparse
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from news_parsers import BACKENDS, parse_news
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+# Previous implementation from News_Sentiment.py: whole page through html.parser, then findAll('tr')
+def legacy_parse(ticker, html):
+    news_table = BeautifulSoup(html, features='html.parser').find(id='news-table')
+    parsed_data = []
+    for row in news_table.find_all('tr'):
+        link = row.find('a')
+        if link is not None:
+            parsed_data.append([ticker, link.text, link['href']])
+    return parsed_data
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, 'finviz_quote_*.html'))):
+        with open(path, 'rb') as f:
+            pages.append((os.path.basename(path)[len('finviz_quote_'):-len('.html')], f.read()))
+    total_bytes = sum(len(html) for _, html in pages)
+    print(f"{len(pages)} page(s), {total_bytes / 1024:.0f} KiB, {args.repeats} repeats")
+
+    parsers = {'legacy (bs4, whole page)': legacy_parse}
+    parsers.update({name: (lambda ticker, html, name=name: parse_news(ticker, html, backend=name)) for name in BACKENDS})
+
+    expected = [[row[:3] for row in legacy_parse(ticker, html)] for ticker, html in pages]
+    for name, parse in parsers.items():
+        rows = [[row[:3] for row in parse(ticker, html)] for ticker, html in pages]
+        assert [[[t, title.strip(), url] for t, title, url in page] for page in rows] == \
+               [[[t, title.strip(), url] for t, title, url in page] for page in expected], name
+
+        started = time.perf_counter()
+        for _ in range(args.repeats):
+            for ticker, html in pages:
+                parse(ticker, html)
+        seconds = (time.perf_counter() - started) / (args.repeats * len(pages))
+        print(f"{name:<26} {seconds * 1000:8.2f} ms/page {1 / seconds:10.0f} pages/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# scoring_benchmark.py
+# Compares the vectorized scoring engine with the previous per-symbol, row-wise
+# implementation on synthetic data and checks that both give the same scores.
+#
+# Usage: python web_app/benchmarks/scoring_benchmark.py [--symbols 50] [--days 5000]
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scoring import compute_scores
+
+
+# Previous implementation from Financial_Scores.py (without the Streamlit caching)
+def legacy_scores(df):
+    df = df.copy()
+    for window in (10, 50, 200):
+        df[f'ma_{window}'] = df['close'].rolling(window=window).mean()
+    df['price_momentum'] = (df['close'] - df['close'].shift(1)) / df['close'].shift(1) * 100
+    df['volatility_score'] = (df['high'] - df['low']) / df['close'] * 100
+    df['volume_score'] = (df['volume'] - df['volume'].rolling(window=50).mean()) / df['volume'].rolling(window=50).mean() * 100
+    df['ema_sma_score'] = df.apply(lambda row: 1 if row['ema'] > row['ma_50'] else -1, axis=1)
+    df['rsi_score'] = df['rsi'].apply(lambda x: 2 if x < 30 else (-2 if x > 70 else 0))
+    df['investment_score'] = 0.25 * df['price_momentum'] + \
+                            0.25 * df['volatility_score'] + \
+                            0.20 * df['volume_score'] + \
+                            0.20 * df['ema_sma_score'] + \
+                            0.10 * df['rsi_score']
+    df['signal'] = df['investment_score'].apply(lambda x: 'Buy' if x > 0 else ('Sell' if x < 0 else 'Hold'))
+    return df
+
+def synthetic_data(n_symbols, n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days)))
+        frames.append(pd.DataFrame({
+            'symbol': f'SYM{i}',
+            'date': pd.bdate_range('1990-01-01', periods=n_days),
+            'close': close,
+            'high': close * (1 + rng.uniform(0, 0.03, n_days)),
+            'low': close * (1 - rng.uniform(0, 0.03, n_days)),
+            'volume': rng.integers(1_000_000, 50_000_000, n_days),
+            'ema': close * (1 + rng.normal(0, 0.01, n_days)),
+            'rsi': rng.uniform(0, 100, n_days),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--days', type=int, default=5000)
+    args = parser.parse_args()
+
+    df = synthetic_data(args.symbols, args.days)
+
+    started = time.perf_counter()
+    legacy = pd.concat([legacy_scores(group) for _, group in df.groupby('symbol', sort=False)])
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    vectorized = compute_scores(df)
+    vectorized_seconds = time.perf_counter() - started
+
+    legacy = legacy.loc[vectorized.index]
+    for col in vectorized.columns:
+        if col == 'signal':
+            assert (legacy[col] == vectorized[col]).all(), col
+        else:
+            assert np.allclose(legacy[col], vectorized[col], equal_nan=True), col
+
+    print(f"{args.symbols} symbols x {args.days} days ({len(df)} rows)")
+    print(f"legacy per-symbol apply: {legacy_seconds:.3f}s")
+    print(f"vectorized engine:       {vectorized_seconds:.3f}s ({legacy_seconds / vectorized_seconds:.0f}x faster)")
+
+if __name__ == '__main__':
+    main()
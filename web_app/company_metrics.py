@@ -0,0 +1,85 @@
+# company_metrics.py
+# Display-ready company profile and financial metrics for the Overview page.
+# company_data is stored typed (numbers and dates, NULL when missing), so the values
+# are formatted here once per (symbol, data version) and every render reuses the
+# cached strings and table.
+
+import pandas as pd
+from data_access import load_company
+from versioned_cache import versioned_cache
+
+MISSING = '-'
+
+# Overview table rows: (label, company_data column, format)
+METRICS = [
+    ("EBITDA", 'EBITDA', 'money'),
+    ("P/E Ratio", 'PERatio', 'ratio'),
+    ("PEG Ratio", 'PEGRatio', 'ratio'),
+    ("Book Value", 'BookValue', 'ratio'),
+    ("Dividend Per Share", 'DividendPerShare', 'price'),
+    ("Dividend Yield", 'DividendYield', 'percent'),
+    ("EPS", 'EPS', 'ratio'),
+    ("Revenue Per Share (TTM)", 'RevenuePerShareTTM', 'ratio'),
+    ("Profit Margin", 'ProfitMargin', 'percent'),
+    ("Operating Margin (TTM)", 'OperatingMarginTTM', 'percent'),
+    ("Return on Assets (TTM)", 'ReturnOnAssetsTTM', 'percent'),
+    ("Return on Equity (TTM)", 'ReturnOnEquityTTM', 'percent'),
+    ("Revenue (TTM)", 'RevenueTTM', 'money'),
+    ("Gross Profit (TTM)", 'GrossProfitTTM', 'money'),
+    ("Diluted EPS (TTM)", 'DilutedEPSTTM', 'ratio'),
+    ("Quarterly Earnings Growth (YoY)", 'QuarterlyEarningsGrowthYOY', 'percent'),
+    ("Quarterly Revenue Growth (YoY)", 'QuarterlyRevenueGrowthYOY', 'percent'),
+    ("Analyst Target Price", 'AnalystTargetPrice', 'price'),
+    ("Analyst Rating (Strong Buy)", 'AnalystRatingStrongBuy', 'count'),
+    ("Analyst Rating (Buy)", 'AnalystRatingBuy', 'count'),
+    ("Analyst Rating (Hold)", 'AnalystRatingHold', 'count'),
+    ("Analyst Rating (Sell)", 'AnalystRatingSell', 'count'),
+    ("Analyst Rating (Strong Sell)", 'AnalystRatingStrongSell', 'count'),
+    ("Trailing P/E", 'TrailingPE', 'ratio'),
+    ("Forward P/E", 'ForwardPE', 'ratio'),
+    ("Price to Sales Ratio (TTM)", 'PriceToSalesRatioTTM', 'ratio'),
+    ("Price to Book Ratio", 'PriceToBookRatio', 'ratio'),
+    ("EV to Revenue", 'EVToRevenue', 'ratio'),
+    ("EV to EBITDA", 'EVToEBITDA', 'ratio'),
+    ("Beta", 'Beta', 'ratio'),
+    ("52 Week High", '52WeekHigh', 'price'),
+    ("52 Week Low", '52WeekLow', 'price'),
+    ("50-Day Moving Avg", '50DayMovingAverage', 'price'),
+    ("200-Day Moving Avg", '200DayMovingAverage', 'price'),
+]
+PROFILE_COLUMNS = ('Name', 'Sector', 'Industry', 'MarketCapitalization', 'Description')
+
+
+# Function to format large amounts with a T/B/M suffix, e.g. 3.45T
+def format_money(value):
+    for divisor, suffix in ((1e12, 'T'), (1e9, 'B'), (1e6, 'M')):
+        if abs(value) >= divisor:
+            return f"{value / divisor:,.2f}{suffix}"
+    return f"{value:,.0f}"
+
+FORMATTERS = {
+    'money': format_money,
+    'ratio': lambda value: f"{value:,.2f}",
+    'price': lambda value: f"${value:,.2f}",
+    'percent': lambda value: f"{value * 100:.2f}%",
+    'count': lambda value: f"{int(value)}",
+}
+
+# Function to format one typed value; NULLs show as MISSING
+def format_metric(value, kind):
+    if value is None or pd.isna(value):
+        return MISSING
+    return FORMATTERS[kind](value)
+
+# Function to build the formatted profile and metrics table of one symbol (cached until new data arrives).
+# Returns (profile dict, metrics DataFrame with Metric and Value columns).
+@versioned_cache()
+def company_metrics(symbol, data_version):
+    company_info = load_company(symbol, columns=PROFILE_COLUMNS + tuple(column for _, column, _ in METRICS))
+    profile = {column: MISSING if pd.isna(company_info[column]) else company_info[column]
+               for column in ('Name', 'Sector', 'Industry', 'Description')}
+    profile['MarketCapitalization'] = format_metric(company_info['MarketCapitalization'], 'money')
+    metrics_df = pd.DataFrame(
+        [(label, format_metric(company_info[column], kind)) for label, column, kind in METRICS],
+        columns=["Metric", "Value"])
+    return profile, metrics_df
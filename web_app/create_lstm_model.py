@@ -1,52 +1,80 @@
-# Creating and saving LSTM model for each companies 
+# Creating and saving LSTM model for each companies
+#
+# Usage:
+#   python web_app/create_lstm_model.py --symbols AAPL MSFT --workers 2 --threads-per-worker 4
+#
+#   python web_app/create_lstm_model.py --incremental
+#   python web_app/create_lstm_model.py --model-type direct
+#
+# Symbols are trained concurrently in a process pool (each worker limited to its own
+# CPU threads), batches are streamed from zero-copy windows through tf.data, training
+# stops early on a chronological validation split, and each finished model is
+# published atomically to the models directory as a new bundle version (model_bundle.py).
+#
+# --incremental fine-tunes the existing model on the days added since its training
+# watermark (kept in the manifest of its bundle) plus a replay sample of older windows,
+# and only publishes it if it does not regress on the validation windows of the full
+# training run, which the model has never been fitted on. The data is scaled with the
+# training-time scaler; once a close falls outside its range the model is retrained in full.
 
-from keras.models import Sequential
-from keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler
+import os
+import sys
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
-import streamlit as st
-
-# Get the database credentials from Streamlit secrets
-db_config = st.secrets["connections"]["mysql"]
-
-# Create SQLAlchemy engine to connect to the MySQL Database
-connection_string = (
-    f"{db_config['dialect']}+mysqlconnector://{db_config['username']}:{db_config['password']}@"
-    f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
-    f"charset={db_config['query']['charset']}"
-)
-
-# Create the SQLAlchemy engine
-engine = create_engine(connection_string)
-
-@st.cache
-# Function to fetch data from the database
-def fetch_data():
-    companies_query = 'SELECT * FROM company_data'
-    daily_data_query = 'SELECT * FROM daily_data'
-    technical_indicator_query = 'SELECT * FROM technical_indicators'
-    
-    # Execute queries and load data into DataFrames
-    with engine.connect() as connection:
-        companies_df = pd.read_sql(companies_query, connection)
-        daily_df = pd.read_sql(daily_data_query, connection)
-        technical_indicator_df = pd.read_sql(technical_indicator_query, connection)
-    
-    return companies_df, daily_df, technical_indicator_df
-
-# Fetch the latest data from the database
-companies_df, daily_df, technical_indicator_df = fetch_data()
-
-# Merge datasets 
-merged_df = pd.merge(daily_df, companies_df, on='symbol', how='inner')
-merged_df = pd.merge(merged_df, technical_indicator_df, on=['symbol', 'date'], how='inner')
-
-# Selecting relevant columns for the model
-final_data = merged_df[['date', 'symbol', 'high', 'low', 'close', 'volume', 'sma', 'ema', 'rsi']]
-
-def create_lstm_model(input_shape):
+from sqlalchemy import create_engine, text, bindparam
+from sklearn.preprocessing import MinMaxScaler
+from windowing import create_dataset, create_multi_horizon_dataset, iter_batches
+from forecasting import HORIZON, MODEL_TYPES
+from export_lstm_weights import verified_layers
+from model_bundle import MinMaxScaling, bundle_path, keras_model_path, read_manifest, write_bundle
+
+SYMBOLS = ['AAPL', 'AMZN', 'GOOGL', 'META', 'MSFT']
+TIME_STEP = 60
+
+# Function to build the connection string from the environment (as the scheduled jobs do),
+# falling back to the Streamlit secrets used by the web app
+def get_connection_string():
+    if os.getenv('DB_HOST'):
+        return (
+            f"mysql+mysqlconnector://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@"
+            f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}?"
+            f"ssl_verify_cert=true&ssl_ca={os.getenv('CA_CERT_PATH')}"
+        )
+    import streamlit as st
+    db_config = st.secrets["connections"]["mysql"]
+    return (
+        f"{db_config['dialect']}+mysqlconnector://{db_config['username']}:{db_config['password']}@"
+        f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+        f"charset={db_config['query']['charset']}"
+    )
+
+# Function to load the closes the models are trained on (days that have indicators, as served)
+def load_closes(symbols):
+    query = text("""
+        SELECT d.symbol, d.date, d.close
+        FROM daily_data d
+        JOIN technical_indicators t ON t.symbol = d.symbol AND t.date = d.date
+        WHERE d.symbol IN :symbols
+        ORDER BY d.symbol, d.date
+    """).bindparams(bindparam('symbols', expanding=True))
+    with create_engine(get_connection_string()).connect() as connection:
+        df = pd.read_sql(query, connection, params={'symbols': list(symbols)})
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+# Function to identify the data the models are trained on: the latest ingestion run, as the dashboard does
+def load_data_version():
+    with create_engine(get_connection_string()).connect() as connection:
+        finished_at = connection.execute(text("SELECT MAX(finished_at) FROM ingestion_runs")).scalar()
+    return str(finished_at)
+
+def create_lstm_model(input_shape, outputs=1):
+    from keras.models import Sequential
+    from keras.layers import LSTM, Dense, Dropout
+
     model = Sequential()
     model.add(LSTM(units=50, return_sequences=True, input_shape=input_shape))
     model.add(Dropout(0.2))
@@ -54,36 +82,222 @@ def create_lstm_model(input_shape):
     model.add(Dropout(0.2))
     model.add(LSTM(units=50, return_sequences=False))
     model.add(Dropout(0.2))
-    model.add(Dense(units=1))
+    model.add(Dense(units=outputs))
     model.compile(optimizer='adam', loss='mean_squared_error')
     return model
 
-def train_and_save_model(symbol, data):
+# Worker initializer: cap the CPU threads each training process may use
+def init_worker(threads):
+    for var in ('OMP_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+# Function to stream (X, y) batches for a range (or subset) of windows through tf.data
+def make_dataset(X, y, batch_size, shuffle, start=0, stop=None, indices=None):
+    import tensorflow as tf
+    signature = (
+        tf.TensorSpec(shape=(None, X.shape[1], 1), dtype=tf.float32),
+        tf.TensorSpec(shape=(None,) + y.shape[1:], dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(
+        lambda: iter_batches(X, y, batch_size=batch_size, start=start, stop=stop, shuffle=shuffle, indices=indices),
+        output_signature=signature,
+    ).prefetch(tf.data.AUTOTUNE)
+
+# Function to build the training windows for the model type: one-step targets for
+# recursive models, the next HORIZON closes for direct models
+def build_windows(scaled_data, model_type):
+    if model_type == 'direct':
+        return create_multi_horizon_dataset(scaled_data, TIME_STEP, HORIZON)
+    return create_dataset(scaled_data, TIME_STEP)
+
+# Function to get the date each window is scored on (its last target day)
+def window_target_dates(dates, y, n_windows):
+    return dates[TIME_STEP + (1 if y.ndim == 1 else y.shape[1]) - 1:][:n_windows]
+
+# Function to publish a model: a new bundle version holding the NumPy weights, the Keras
+# checkpoint and the metadata (training watermark, first validation day, training-time scaler),
+# made live in one atomic switch
+def publish_model(model, symbol, scaling, dates, options, mode, validation_from):
+    metadata = {
+        'symbol': symbol,
+        'mode': mode,
+        'model_type': options['model_type'],
+        'horizon': HORIZON if options['model_type'] == 'direct' else 1,
+        'time_step': TIME_STEP,
+        'trained_from': str(dates[0])[:10],
+        'trained_through': str(dates[-1])[:10],
+        'validation_from': str(validation_from)[:10],
+        'trained_at': pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'data_version': options['data_version'],
+    }
+    layers, _ = verified_layers(model)  # Checked against model.predict before anything is published
+    write_bundle(options['models_dir'], symbol, layers, scaling, metadata, write_keras_model=model.save)
+
+def train_and_save_model(symbol, closes, dates, options):
+    from keras.callbacks import EarlyStopping
+
     # Preprocess data for the company
     scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(data[['close']].values)
+    scaled_data = scaler.fit_transform(closes.reshape(-1, 1))
 
-    # Create dataset
-    time_step = 60
-    X, y = create_dataset(scaled_data, time_step)
-    X = X.reshape(X.shape[0], X.shape[1], 1)
+    # Create dataset, keeping the most recent windows for validation
+    X, y = build_windows(scaled_data, options['model_type'])
+    split = int(len(X) * (1 - options['val_split']))
+    train_ds = make_dataset(X, y, options['batch_size'], shuffle=True, stop=split)
+    val_ds = make_dataset(X, y, options['batch_size'], shuffle=False, start=split)
 
     # Create and train the model
-    model = create_lstm_model((X.shape[1], 1))
-    model.fit(X, y, epochs=20, batch_size=64, verbose=1)
-
-    # Save the model
-    model.save(f'{symbol}_lstm_model.h5')
-    print(f'Model for {symbol} saved successfully!')
-
-def create_dataset(data, time_step=60):
-    X, y = [], []
-    for i in range(len(data) - time_step):
-        X.append(data[i:(i + time_step), 0])
-        y.append(data[i + time_step, 0])
-    return np.array(X), np.array(y)
-
-symbols = ['AAPL', 'AMZN', 'GOOGL', 'META', 'MSFT']
-for symbol in symbols:
-    company_data = final_data[final_data['symbol'] == symbol]
-    train_and_save_model(symbol, company_data)
+    model = create_lstm_model((TIME_STEP, 1), outputs=1 if y.ndim == 1 else y.shape[1])
+    early_stopping = EarlyStopping(monitor='val_loss', patience=options['patience'], restore_best_weights=True)
+    history = model.fit(train_ds, validation_data=val_ds, epochs=options['epochs'],
+                        callbacks=[early_stopping], verbose=options['verbose'])
+
+    # Save the model; the validation windows stay held out for later fine-tuning checks
+    validation_from = window_target_dates(dates, y, len(X))[split]
+    scaling = MinMaxScaling(scaler.data_min_[0], scaler.data_max_[0])
+    publish_model(model, symbol, scaling, dates, options, mode='full', validation_from=validation_from)
+    epochs = len(history.history['loss'])
+    return symbol, f"saved successfully! ({epochs} epochs, best val_loss {min(history.history['val_loss']):.6f})"
+
+# Function to fine-tune the existing model on the windows added since its training watermark
+def finetune_and_save_model(symbol, closes, dates, options):
+    from keras.models import load_model
+    from keras.optimizers import Adam
+
+    bundle = bundle_path(options['models_dir'], symbol)
+    metadata = read_manifest(bundle) if bundle else None
+    if (metadata is None or keras_model_path(bundle) is None or 'trained_through' not in metadata
+            or metadata.get('model_type', 'recursive') != options['model_type']):
+        return train_and_save_model(symbol, closes, dates, options)  # Nothing to start from yet
+
+    # Inputs on the scale the model was trained on. Converted models have no training-time
+    # scaler, and a new high or low outside its range would be a different scale for the
+    # warm-started weights, so both are retrained in full instead.
+    if not metadata.get('scaler'):
+        return train_and_save_model(symbol, closes, dates, options)
+    scaling = MinMaxScaling(metadata['scaler']['data_min'], metadata['scaler']['data_max'])
+    if closes.min() < scaling.data_min or closes.max() > scaling.data_max:
+        return train_and_save_model(symbol, closes, dates, options)
+    scaled_data = scaling.transform(closes.reshape(-1, 1))
+    X, y = build_windows(scaled_data, options['model_type'])
+
+    # A window is new once its last target day is past the watermark
+    target_dates = window_target_dates(dates, y, len(X))
+    new = np.flatnonzero(target_dates > np.datetime64(metadata['trained_through']))
+    if len(new) == 0:
+        return symbol, 'already up to date.'
+
+    # Held out: the newest pre-watermark windows, which the full training run kept for validation
+    # and never fitted on. Models without them (trained before they were recorded, or with too
+    # little history) are retrained in full instead of fine-tuned without a check.
+    older = np.arange(new[0])
+    held_out = older[target_dates[older] >= np.datetime64(metadata.get('validation_from', 'NaT'))]
+    if len(held_out) == 0:
+        return train_and_save_model(symbol, closes, dates, options)
+    holdout = held_out[-options['holdout_size']:]
+    # Replay sample of the windows the model was trained on, against forgetting
+    rng = np.random.default_rng(options['seed'])
+    replay_pool = np.setdiff1d(older, held_out)
+    replay = rng.choice(replay_pool, size=min(len(replay_pool), options['replay_ratio'] * len(new)), replace=False)
+
+    model = load_model(keras_model_path(bundle))
+    holdout_ds = make_dataset(X, y, options['batch_size'], shuffle=False, indices=holdout)
+    baseline_loss = model.evaluate(holdout_ds, verbose=0)
+
+    model.compile(optimizer=Adam(learning_rate=options['finetune_lr']), loss='mean_squared_error')
+    train_ds = make_dataset(X, y, options['batch_size'], shuffle=True, indices=np.concatenate([new, replay]))
+    model.fit(train_ds, epochs=options['finetune_epochs'], verbose=options['verbose'])
+
+    candidate_loss = model.evaluate(holdout_ds, verbose=0)
+    if candidate_loss > baseline_loss * (1 + options['regression_tolerance']):
+        return symbol, (f'fine-tuned model rejected: holdout loss {candidate_loss:.6f} '
+                        f'vs {baseline_loss:.6f} for the current model.')
+
+    publish_model(model, symbol, scaling, dates, options, mode='incremental', validation_from=metadata['validation_from'])
+    return symbol, (f'fine-tuned on {len(new)} new windows + {len(replay)} replayed, '
+                    f'holdout loss {baseline_loss:.6f} -> {candidate_loss:.6f}.')
+
+# Function to parse --val-split: the validation windows drive early stopping, so it must be in (0, 1)
+def fraction(value):
+    value = float(value)
+    if not 0 < value < 1:
+        raise argparse.ArgumentTypeError(f'{value} is not between 0 and 1 (exclusive)')
+    return value
+
+def main():
+    parser = argparse.ArgumentParser(description='Train and publish the LSTM models.')
+    parser.add_argument('--symbols', nargs='+', default=SYMBOLS)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--val-split', type=fraction, default=0.1)
+    parser.add_argument('--patience', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=min(len(SYMBOLS), os.cpu_count() or 1))
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='CPU threads per training process (default: cores / workers)')
+    parser.add_argument('--models-dir', default=os.getenv('MODELS_DIR', os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--verbose', type=int, default=2)
+    parser.add_argument('--model-type', choices=MODEL_TYPES, default='recursive',
+                        help=f'recursive: one-step model rolled forward; direct: predicts all {HORIZON} days in one pass')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Fine-tune existing models on the days added since their last training')
+    parser.add_argument('--finetune-epochs', type=int, default=3)
+    parser.add_argument('--finetune-lr', type=float, default=1e-4)
+    parser.add_argument('--replay-ratio', type=int, default=4, help='Older windows replayed per new window')
+    parser.add_argument('--holdout-size', type=int, default=500,
+                        help='Newest held-out validation windows the fine-tuned model is checked on')
+    parser.add_argument('--regression-tolerance', type=float, default=0.05,
+                        help='Allowed relative increase of the holdout loss before a fine-tuned model is rejected')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+    options = {
+        'epochs': args.epochs,
+        'batch_size': args.batch_size,
+        'val_split': args.val_split,
+        'patience': args.patience,
+        'models_dir': args.models_dir,
+        'verbose': args.verbose,
+        'finetune_epochs': args.finetune_epochs,
+        'finetune_lr': args.finetune_lr,
+        'replay_ratio': args.replay_ratio,
+        'holdout_size': args.holdout_size,
+        'regression_tolerance': args.regression_tolerance,
+        'seed': args.seed,
+        'model_type': args.model_type,
+        'data_version': load_data_version(),
+    }
+    train = finetune_and_save_model if args.incremental else train_and_save_model
+
+    final_data = load_closes(args.symbols)
+    closes = {symbol: group['close'].to_numpy(dtype=float) for symbol, group in final_data.groupby('symbol')}
+    dates = {symbol: group['date'].to_numpy() for symbol, group in final_data.groupby('symbol')}
+
+    # Spawned workers so each one initialises its own TensorFlow runtime and thread pools
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=context,
+                             initializer=init_worker, initargs=(threads,)) as executor:
+        futures, failed = {}, []
+        for symbol in args.symbols:
+            if len(closes.get(symbol, [])) < 2 * TIME_STEP + (HORIZON if args.model_type == 'direct' else 0):
+                print(f'Skipping {symbol}: not enough history.')
+                continue
+            futures[executor.submit(train, symbol, closes[symbol], dates[symbol], options)] = symbol
+        for future in as_completed(futures):
+            try:
+                symbol, message = future.result()
+                print(f'Model for {symbol} {message}')
+            except Exception as e:
+                print(f'Training failed for {futures[future]}: {e}')
+                failed.append(futures[future])
+
+    if failed:
+        print(f"Training failed for: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
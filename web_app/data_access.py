@@ -0,0 +1,322 @@
+# data_access.py
+# Targeted queries for the dashboard pages: each page asks for the symbol, date
+# range and columns it shows, and the daily/indicator join runs in MySQL on the
+# (symbol, date) keys instead of loading whole tables into pandas.
+# When the scheduler has published a columnar snapshot (see
+# scheduled_update_database/publish_snapshot.py) it is memory-mapped instead.
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+import streamlit as st
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Snapshot reads are optional; without pyarrow every load goes to MySQL
+    feather = None
+
+DAILY_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+INDICATOR_COLUMNS = ('sma', 'ema', 'rsi')
+COMPANY_COLUMNS = (
+    'symbol', 'AssetType', 'Name', 'Description', 'CIK', 'Exchange', 'Currency', 'Country',
+    'Sector', 'Industry', 'Address', 'OfficialSite', 'FiscalYearEnd', 'LatestQuarter',
+    'MarketCapitalization', 'EBITDA', 'PERatio', 'PEGRatio', 'BookValue', 'DividendPerShare',
+    'DividendYield', 'EPS', 'RevenuePerShareTTM', 'ProfitMargin', 'OperatingMarginTTM',
+    'ReturnOnAssetsTTM', 'ReturnOnEquityTTM', 'RevenueTTM', 'GrossProfitTTM', 'DilutedEPSTTM',
+    'QuarterlyEarningsGrowthYOY', 'QuarterlyRevenueGrowthYOY', 'AnalystTargetPrice',
+    'AnalystRatingStrongBuy', 'AnalystRatingBuy', 'AnalystRatingHold', 'AnalystRatingSell',
+    'AnalystRatingStrongSell', 'TrailingPE', 'ForwardPE', 'PriceToSalesRatioTTM',
+    'PriceToBookRatio', 'EVToRevenue', 'EVToEBITDA', 'Beta', '52WeekHigh', '52WeekLow',
+    '50DayMovingAverage', '200DayMovingAverage', 'SharesOutstanding', 'DividendDate', 'ExDividendDate',
+)
+
+# How long query results stay cached (seconds); the data only changes once a day
+CACHE_TTL = 3600
+
+# Snapshot directory written by publish_snapshot.py; unset means every load goes to MySQL
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR')
+
+# Connection pool settings; any of them can be overridden per connection in secrets.toml
+POOL_DEFAULTS = {
+    'pool_size': 5,
+    'max_overflow': 5,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,  # Recycle before the server's idle timeout closes the connection
+}
+
+
+# Counters for pool checkouts and the time spent waiting for a connection
+class PoolMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def count(self, name):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds):
+        with self.lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool):
+        with self.lock:
+            return {
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'avg_wait_ms': 1000 * self.wait_total / self.waits if self.waits else 0.0,
+                'max_wait_ms': 1000 * self.wait_max,
+            }
+
+
+# Function to create one pooled engine from a [connections.*] secrets section
+def _create_engine(db_config):
+    connection_string = (
+        f"{db_config['dialect']}+mysqlconnector://{db_config['username']}:{db_config['password']}@"
+        f"{db_config['host']}:{db_config['port']}/{db_config['database']}?"
+        f"charset={db_config['query']['charset']}"
+    )
+    pool_settings = {key: int(db_config.get(key, default)) for key, default in POOL_DEFAULTS.items()}
+    engine = create_engine(connection_string, pool_pre_ping=True, **pool_settings)
+
+    metrics = PoolMetrics()
+    event.listen(engine, 'connect', lambda *args: metrics.count('connects'))
+    event.listen(engine, 'checkout', lambda *args: metrics.count('checkouts'))
+    event.listen(engine, 'checkin', lambda *args: metrics.count('checkins'))
+    engine.pool_metrics = metrics
+    return engine
+
+# One engine (and pool) per process, shared by every session and rerun.
+# Reads go to [connections.mysql_replica] when it is configured.
+@st.cache_resource
+def get_engines():
+    connections = st.secrets["connections"]
+    engines = {'primary': _create_engine(connections["mysql"])}
+    if "mysql_replica" in connections:
+        engines['replica'] = _create_engine(connections["mysql_replica"])
+    return engines
+
+def get_engine(read_only=True):
+    engines = get_engines()
+    if read_only and 'replica' in engines:
+        return engines['replica']
+    return engines['primary']
+
+# Function to check out a connection, recording how long the pool made us wait
+@contextmanager
+def connect(read_only=True):
+    engine = get_engine(read_only)
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        engine.pool_metrics.record_wait(time.perf_counter() - started)
+        yield connection
+
+# Function to report pool status and checkout/wait metrics for each engine
+def get_pool_metrics():
+    return {name: engine.pool_metrics.snapshot(engine.pool) for name, engine in get_engines().items()}
+
+# Function to reject column names that are not part of the schema (they are interpolated into SQL)
+def _check_columns(columns, allowed):
+    unknown = [col for col in columns if col not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return list(columns)
+
+def _read_sql(query, params):
+    with connect() as connection:
+        return pd.read_sql(text(query), connection, params=params)
+
+# Function to resolve the live snapshot version directory, or None when there is none
+def snapshot_path():
+    if feather is None or not SNAPSHOT_DIR:
+        return None
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, 'CURRENT')) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(SNAPSHOT_DIR, version)
+    return path if os.path.isdir(path) else None
+
+def _read_snapshot(path, columns=None):
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+def _filter_dates(df, start, end):
+    if start is not None:
+        df = df[df['date'] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df['date'] <= pd.Timestamp(end)]
+    return df
+
+# Function to identify the current data: the live snapshot version (the snapshot is published
+# after every other job, so a new run always comes with a new version), or without a
+# snapshot the last finished ingestion run. Page computations are cached on this instead
+# of hashing their input frames.
+def get_data_version():
+    snapshot = snapshot_path()
+    if snapshot:
+        return os.path.basename(snapshot)
+    return f"db@{_last_ingestion_run()}"
+
+@st.cache_data(ttl=60)
+def _last_ingestion_run():
+    df = _read_sql("SELECT MAX(finished_at) AS finished_at FROM ingestion_runs", {})
+    return str(df['finished_at'].iloc[0])
+
+# The public loaders resolve the snapshot version first so a newly published
+# snapshot is part of the cache key and replaces cached results immediately
+def load_symbols():
+    return _load_symbols(snapshot_path())
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_symbols(snapshot):
+    if snapshot:
+        return sorted(_read_snapshot(os.path.join(snapshot, 'company_data.arrow'), ['symbol'])['symbol'])
+    return _read_sql("SELECT symbol FROM company_data ORDER BY symbol", {})['symbol'].tolist()
+
+# Function to load one company's row; returns a Series with the requested columns
+def load_company(symbol, columns=COMPANY_COLUMNS):
+    return _load_company(snapshot_path(), symbol, tuple(_check_columns(columns, COMPANY_COLUMNS)))
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_company(snapshot, symbol, columns):
+    if snapshot:
+        df = _read_snapshot(os.path.join(snapshot, 'company_data.arrow'), list(dict.fromkeys(('symbol',) + columns)))
+        df = df.loc[df['symbol'] == symbol, list(columns)]
+    else:
+        select = ', '.join(f"`{col}`" for col in columns)
+        df = _read_sql(f"SELECT {select} FROM company_data WHERE symbol = :symbol", {'symbol': symbol})
+    return df.iloc[0] if not df.empty else pd.Series(index=columns, dtype=object)
+
+# Function to load one symbol's daily bars, optionally joined with its technical indicators
+# start/end are inclusive dates; when indicators are requested only days that have them are returned
+def load_daily(symbol, columns=DAILY_COLUMNS, indicators=(), start=None, end=None):
+    columns = tuple(_check_columns(columns, DAILY_COLUMNS))
+    indicators = tuple(_check_columns(indicators, INDICATOR_COLUMNS))
+    return _load_daily(snapshot_path(), symbol, columns, indicators, start, end)
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_daily(snapshot, symbol, columns, indicators, start, end):
+    if snapshot:
+        path = os.path.join(snapshot, 'daily', f'symbol={symbol}.arrow')
+        if os.path.exists(path):
+            df = _read_snapshot(path, ['symbol', 'date'] + list(columns) + list(indicators))
+            df = _filter_dates(df, start, end)
+            if indicators:
+                df = df.dropna(subset=list(indicators))  # Same rows as the inner join in MySQL
+            return df.reset_index(drop=True)
+
+    select = ['d.symbol', 'd.date'] + [f"d.{col}" for col in columns] + [f"t.{col}" for col in indicators]
+    query = f"SELECT {', '.join(select)} FROM daily_data d"
+    if indicators:
+        query += " JOIN technical_indicators t ON t.symbol = d.symbol AND t.date = d.date"
+    query += " WHERE d.symbol = :symbol"
+
+    params = {'symbol': symbol}
+    if start is not None:
+        query += " AND d.date >= :start"
+        params['start'] = pd.Timestamp(start).date()
+    if end is not None:
+        query += " AND d.date <= :end"
+        params['end'] = pd.Timestamp(end).date()
+    query += " ORDER BY d.date"
+
+    df = _read_sql(query, params)
+    df['date'] = pd.to_datetime(df['date'])
+    for col in indicators:
+        df[col] = df[col].astype(float)  # DECIMAL columns come back as Python Decimals
+    return df
+
+# Results of the scheduled forecast job (scheduled_update_database/forecast_data.py);
+# empty results mean the job has not run for this symbol yet. Like the daily loaders they
+# are cached on the data version, so a new forecast or score run replaces them immediately.
+def load_forecast(symbol):
+    return _load_forecast(get_data_version(), symbol)
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_forecast(data_version, symbol):
+    df = _read_sql("SELECT date, predicted_close FROM lstm_forecasts WHERE symbol = :symbol ORDER BY date", {'symbol': symbol})
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+# Investment factors, composite score and signal stored by scheduled_update_database/score_data.py,
+# with the day's close for the forecast chart
+INVESTMENT_SCORE_COLUMNS = ('price_momentum', 'volatility_score', 'volume_score', 'ema_sma_score',
+                            'rsi_score', 'investment_score', 'signal')
+
+def load_investment_scores(symbol):
+    return _load_investment_scores(get_data_version(), symbol)
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_investment_scores(data_version, symbol):
+    select = ', '.join(f"s.`{col}`" for col in INVESTMENT_SCORE_COLUMNS)
+    df = _read_sql(
+        f"""SELECT s.date, d.close, {select}
+            FROM investment_scores s
+            JOIN daily_data d ON d.symbol = s.symbol AND d.date = s.date
+            WHERE s.symbol = :symbol ORDER BY s.date""",
+        {'symbol': symbol})
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+# The evaluation store keeps one series per model version; the page shows the most recently updated one
+LATEST_MODEL_VERSION = """
+    SELECT model_version FROM lstm_metrics WHERE symbol = :symbol ORDER BY generated_at DESC LIMIT 1
+"""
+
+def load_backtest(symbol):
+    return _load_backtest(get_data_version(), symbol)
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_backtest(data_version, symbol):
+    df = _read_sql(
+        f"""SELECT b.date, b.actual_close, b.predicted_close
+            FROM lstm_backtest b
+            JOIN ({LATEST_MODEL_VERSION}) m ON m.model_version = b.model_version
+            WHERE b.symbol = :symbol ORDER BY b.date""",
+        {'symbol': symbol})
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+# Function to read MAE/MSE from the running error sums of the latest model version
+def load_model_metrics(symbol):
+    return _load_model_metrics(get_data_version(), symbol)
+
+@st.cache_data(ttl=CACHE_TTL)
+def _load_model_metrics(data_version, symbol):
+    df = _read_sql(
+        """SELECT model_version, sum_abs_error / n_predictions AS mae, sum_sq_error / n_predictions AS mse,
+                  n_predictions, generated_at
+           FROM lstm_metrics WHERE symbol = :symbol ORDER BY generated_at DESC LIMIT 1""",
+        {'symbol': symbol})
+    return df.iloc[0].to_dict() if not df.empty else None
+
+# Sentiment series (see sentiment_series.py); refreshed with the news, so cached briefly
+SENTIMENT_TTL = 300
+
+@st.cache_data(ttl=SENTIMENT_TTL)
+def load_sentiment_daily(symbol):
+    df = _read_sql(
+        "SELECT date, n_headlines, sum_score FROM sentiment_daily WHERE symbol = :symbol ORDER BY date",
+        {'symbol': symbol})
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+@st.cache_data(ttl=SENTIMENT_TTL)
+def load_sentiment_state(symbol):
+    df = _read_sql("SELECT state FROM sentiment_state WHERE symbol = :symbol", {'symbol': symbol})
+    return df['state'].iloc[0] if not df.empty else None
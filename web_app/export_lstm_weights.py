@@ -0,0 +1,81 @@
+# export_lstm_weights.py
+# Converts Keras .h5 models trained before model bundles existed into bundles
+# (model_bundle.py), the only model artifact the dashboard and the forecast job load.
+# The extracted NumPy weights are checked against model.predict and only written if
+# they agree within the tolerance, so the dashboard never serves weights that differ
+# from their model. The .h5 is stored in the bundle as its Keras checkpoint.
+#
+#   python web_app/export_lstm_weights.py path/to/AAPL_lstm_model.h5 ...
+#   python web_app/export_lstm_weights.py --from-dir legacy_models --remove
+#
+# Their training-time scaler was never recorded, so the bundles are served with a
+# scaler fitted on the current history (as the .h5 files were); retraining records it.
+
+import os
+import shutil
+import argparse
+from lstm_runtime import LSTMRuntime, extract_layers, verify_runtime
+from model_bundle import write_bundle
+
+DEFAULT_TOLERANCE = 1e-4
+LEGACY_SUFFIX = '_lstm_model.h5'
+
+# Function to extract a Keras model's layers for the runtime, checked against model.predict
+def verified_layers(model, tolerance=DEFAULT_TOLERANCE):
+    layers = extract_layers(model)
+    error = verify_runtime(model, LSTMRuntime(layers))
+    if error > tolerance:
+        raise ValueError(f"NumPy runtime differs from model.predict by {error:.2e} (tolerance {tolerance:.0e})")
+    return layers, error
+
+# Function to convert one {symbol}_lstm_model.h5 into a bundle; returns (symbol, version, max abs difference)
+def convert_model(h5_path, models_dir, tolerance=DEFAULT_TOLERANCE):
+    from keras.models import load_model
+
+    symbol = os.path.basename(h5_path)[:-len(LEGACY_SUFFIX)]
+    model = load_model(h5_path, compile=False)
+    layers, error = verified_layers(model, tolerance)
+    outputs = model.output_shape[-1]
+    metadata = {
+        'symbol': symbol,
+        'mode': 'converted',
+        'model_type': 'direct' if outputs > 1 else 'recursive',
+        'horizon': outputs,
+        'time_step': model.input_shape[1],
+        'source': os.path.basename(h5_path),
+    }
+    version = write_bundle(models_dir, symbol, layers, None, metadata,
+                           write_keras_model=lambda path: shutil.copyfile(h5_path, path))
+    return symbol, version, error
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert legacy .h5 LSTM models into model bundles.')
+    parser.add_argument('models', nargs='*', help=f'*{LEGACY_SUFFIX} files to convert')
+    parser.add_argument('--from-dir', help=f'Convert every *{LEGACY_SUFFIX} in this directory')
+    parser.add_argument('--models-dir', default=os.getenv('MODELS_DIR', os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--remove', action='store_true', help='Delete each .h5 once its bundle is written')
+    args = parser.parse_args()
+
+    paths = list(args.models)
+    if args.from_dir:
+        paths += sorted(os.path.join(args.from_dir, name) for name in os.listdir(args.from_dir) if name.endswith(LEGACY_SUFFIX))
+    if not paths:
+        parser.error('no models to convert')
+
+    failed = []
+    for h5_path in paths:
+        try:
+            symbol, version, error = convert_model(h5_path, args.models_dir, args.tolerance)
+            print(f"Converted {symbol} to bundle {version} (max abs difference {error:.2e})")
+            if args.remove:
+                os.remove(h5_path)
+        except Exception as e:
+            failed.append(h5_path)
+            print(f"Conversion failed for {h5_path}: {e}")
+
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
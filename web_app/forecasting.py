@@ -0,0 +1,108 @@
+# forecasting.py
+# Recursive multi-day forecasting with the LSTM models.
+# Each step calls the model through a compiled tf.function instead of model.predict,
+# and reads its input window as a view into one preallocated buffer, so a 30-day
+# rollout does no per-step allocation or Keras predict-loop overhead.
+# Models served by the NumPy runtime are called directly and TensorFlow is never imported.
+# Direct models (model_type 'direct' in their metadata) emit the whole horizon in one pass.
+
+import weakref
+import threading
+from collections import OrderedDict
+import numpy as np
+from lstm_runtime import LSTMRuntime
+
+HORIZON = 30
+MODEL_TYPES = ('recursive', 'direct')
+
+_compiled_calls = weakref.WeakKeyDictionary()
+
+# Compiled calls of combined recursive models, keyed by (input shape, models); bounded
+# because the keys hold the models
+GROUP_CACHE_SIZE = 8
+_group_calls = OrderedDict()
+_group_calls_lock = threading.Lock()
+
+# Function to get (and cache per model) a compiled inference call
+def _compiled_call(model):
+    if isinstance(model, LSTMRuntime):
+        return model.predict_on_batch
+    call = _compiled_calls.get(model)
+    if call is None:
+        import tensorflow as tf
+        call = tf.function(lambda inputs: model(inputs, training=False), reduce_retracing=True)
+        _compiled_calls[model] = call
+    return call
+
+# Function to forecast `horizon` days with a model of either type
+# windows: scaled inputs of shape (batch, time_step); returns scaled predictions (batch, horizon)
+def forecast(model, windows, horizon=HORIZON, model_type='recursive'):
+    if model_type == 'direct':
+        windows = np.asarray(windows, dtype=np.float32)
+        return np.asarray(_compiled_call(model)(windows[..., None]))[:, :horizon]
+    return rollout(model, windows, horizon)
+
+# Function to roll a one-step model forward `horizon` days
+# windows: scaled inputs of shape (batch, time_step); returns scaled predictions (batch, horizon)
+def rollout(model, windows, horizon=HORIZON):
+    return _rollout(_compiled_call(model), [np.asarray(windows, dtype=np.float32)], horizon)[0]
+
+# Function to get (and cache per group of models) one compiled call for several models that
+# take the same window, so repeated forecasts reuse the traced graph instead of rebuilding it
+def _compiled_group_call(group_models, input_shape):
+    key = (input_shape, tuple(group_models))
+    with _group_calls_lock:
+        call = _group_calls.get(key)
+        if call is not None:
+            _group_calls.move_to_end(key)
+            return call
+    import tensorflow as tf
+    inputs = [tf.keras.Input(shape=input_shape) for _ in group_models]
+    outputs = [model(layer_input) for model, layer_input in zip(group_models, inputs)]
+    combined = tf.keras.Model(inputs, outputs)
+    call = tf.function(lambda group_inputs: combined(group_inputs, training=False))
+    with _group_calls_lock:
+        _group_calls[key] = call
+        while len(_group_calls) > GROUP_CACHE_SIZE:
+            _group_calls.popitem(last=False)
+    return call
+
+# Function to forecast several symbols at once; models, windows and model_types are dicts keyed by symbol.
+# Recursive Keras models that take the same window length are combined into one graph so
+# each step is a single call for the whole group.
+def rollout_many(models, windows, horizon=HORIZON, model_types=None):
+    forecasts, groups = {}, {}
+    for symbol, model in models.items():
+        model_type = (model_types or {}).get(symbol, 'recursive')
+        if model_type == 'direct':
+            forecasts[symbol] = forecast(model, np.reshape(windows[symbol], (1, -1)), horizon, model_type)[0]
+        elif isinstance(model, LSTMRuntime):
+            forecasts[symbol] = rollout(model, np.reshape(windows[symbol], (1, -1)), horizon)[0]
+        else:
+            groups.setdefault(tuple(model.input_shape[1:]), []).append(symbol)
+
+    for input_shape, symbols in groups.items():
+        call = _compiled_group_call([models[symbol] for symbol in symbols], input_shape)
+        group_windows = [np.asarray(windows[symbol], dtype=np.float32).reshape(1, -1) for symbol in symbols]
+        predictions = _rollout(call, group_windows, horizon)
+        forecasts.update({symbol: pred[0] for symbol, pred in zip(symbols, predictions)})
+    return forecasts
+
+def _rollout(call, windows, horizon):
+    time_step = windows[0].shape[1]
+    # Buffer holds the input window followed by the predictions; step t reads [t, t + time_step)
+    buffers = []
+    for window in windows:
+        buffer = np.empty((window.shape[0], time_step + horizon, 1), dtype=np.float32)
+        buffer[:, :time_step, 0] = window
+        buffers.append(buffer)
+
+    for step in range(horizon):
+        step_inputs = [buffer[:, step:step + time_step] for buffer in buffers]
+        outputs = call(step_inputs if len(buffers) > 1 else step_inputs[0])
+        if len(buffers) == 1:
+            outputs = [outputs]
+        for buffer, output in zip(buffers, outputs):
+            buffer[:, time_step + step, 0] = np.asarray(output)[:, 0]
+
+    return [buffer[:, time_step:, 0].copy() for buffer in buffers]
@@ -0,0 +1,115 @@
+# lstm_runtime.py
+# NumPy forward pass for the stacked LSTM models, so the dashboard can serve forecasts
+# without importing TensorFlow. Weights are extracted from the Keras models into the
+# model bundles (model_bundle.py), checked against model.predict before they are
+# written. The gate layout follows Keras: kernel columns are
+# [input, forget, cell, output], each `units` wide.
+
+import numpy as np
+
+ACTIVATIONS = {
+    'sigmoid': lambda x: 1.0 / (1.0 + np.exp(-x)),
+    'hard_sigmoid': lambda x: np.clip(0.2 * x + 0.5, 0.0, 1.0),
+    'tanh': np.tanh,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'linear': lambda x: x,
+}
+
+
+# Function to run one LSTM layer over a batch of sequences: x has shape (batch, time, features)
+def _lstm(x, layer):
+    kernel, recurrent_kernel, bias = layer['kernel'], layer['recurrent_kernel'], layer['bias']
+    activation = ACTIVATIONS[layer['activation']]
+    recurrent_activation = ACTIVATIONS[layer['recurrent_activation']]
+    units = recurrent_kernel.shape[0]
+    batch, time_steps, _ = x.shape
+
+    # Input projections for every time step in one matrix product; only h @ U is sequential
+    projected = x @ kernel + bias
+    h = np.zeros((batch, units), dtype=x.dtype)
+    c = np.zeros((batch, units), dtype=x.dtype)
+    outputs = np.empty((batch, time_steps, units), dtype=x.dtype) if layer['return_sequences'] else None
+    for t in range(time_steps):
+        z = projected[:, t] + h @ recurrent_kernel
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        g = activation(z[:, 2 * units:3 * units])
+        o = recurrent_activation(z[:, 3 * units:])
+        c = f * c + i * g
+        h = o * activation(c)
+        if outputs is not None:
+            outputs[:, t] = h
+    return outputs if outputs is not None else h
+
+def _dense(x, layer):
+    return ACTIVATIONS[layer['activation']](x @ layer['kernel'] + layer['bias'])
+
+
+# Stack of LSTM/Dense layers with the small part of the Keras model API the app uses
+class LSTMRuntime:
+    def __init__(self, layers, dtype=np.float32):
+        self.dtype = dtype
+        self.layers = [
+            {name: np.asarray(value, dtype=dtype) if isinstance(value, np.ndarray) else value for name, value in layer.items()}
+            for layer in layers
+        ]
+        first = self.layers[0]
+        self.input_shape = (None, first.get('time_steps'), first['kernel'].shape[0])
+        self.output_shape = (None, self.layers[-1]['kernel'].shape[1])
+
+    # Function to predict for a batch of windows shaped (batch, time_step) or (batch, time_step, features)
+    def predict(self, X, batch_size=1024):
+        X = np.asarray(X, dtype=self.dtype)
+        if X.ndim == 2:
+            X = X[..., None]
+        outputs = [self._forward(X[start:start + batch_size]) for start in range(0, len(X), batch_size)]
+        return np.concatenate(outputs) if outputs else np.empty((0,) + self.output_shape[1:], dtype=self.dtype)
+
+    def predict_on_batch(self, X):
+        return self.predict(X, batch_size=max(len(X), 1))
+
+    def __call__(self, X, training=False):
+        return self.predict_on_batch(X)
+
+    def _forward(self, x):
+        for layer in self.layers:
+            x = _lstm(x, layer) if layer['type'] == 'lstm' else _dense(x, layer)
+        return x
+
+
+# Function to read the layer weights and settings out of a Keras model (Dropout is a no-op at inference)
+def extract_layers(model):
+    layers = []
+    time_steps = model.input_shape[1]
+    for keras_layer in model.layers:
+        kind = type(keras_layer).__name__
+        config = keras_layer.get_config()
+        weights = keras_layer.get_weights()
+        if kind == 'LSTM':
+            layers.append({
+                'type': 'lstm',
+                'kernel': weights[0], 'recurrent_kernel': weights[1],
+                'bias': weights[2] if config.get('use_bias', True) else np.zeros(weights[0].shape[1]),
+                'activation': config['activation'],
+                'recurrent_activation': config['recurrent_activation'],
+                'return_sequences': bool(config['return_sequences']),
+            })
+        elif kind == 'Dense':
+            layers.append({
+                'type': 'dense',
+                'kernel': weights[0],
+                'bias': weights[1] if config.get('use_bias', True) else np.zeros(weights[0].shape[1]),
+                'activation': config['activation'],
+            })
+        elif kind not in ('Dropout', 'InputLayer'):
+            raise ValueError(f"Unsupported layer for the NumPy runtime: {kind}")
+    if layers:
+        layers[0]['time_steps'] = time_steps
+    return layers
+
+# Function to check a runtime against the Keras model on sample windows; returns the max abs difference
+def verify_runtime(model, runtime, samples=256, seed=0):
+    time_steps = model.input_shape[1]
+    X = np.random.default_rng(seed).random((samples, time_steps, 1), dtype=np.float32)
+    expected = np.asarray(model.predict(X, verbose=0))
+    return float(np.max(np.abs(runtime.predict(X) - expected)))
@@ -0,0 +1,182 @@
+# model_bundle.py
+# Versioned model bundles: the single artifact of a symbol's model. One directory holds
+# the NumPy weights served by the dashboard, the Keras checkpoint training resumes from
+# and all metadata, written by the training script and loaded in one step with
+# memory-mapped weights. Serving scales with the training-time scaler from the manifest,
+# so it only needs the last time_step closes and never refits a scaler over the full history.
+#
+# Layout under MODELS_DIR:
+#   {symbol}_lstm_bundle/CURRENT                      -> name of the live version, swapped atomically
+#   {symbol}_lstm_bundle/<version>/manifest.json      -> layers, scaler, model type, window, training
+#                                                        range, data version and sha256 of every file
+#   {symbol}_lstm_bundle/<version>/layer<i>_<name>.npy
+#   {symbol}_lstm_bundle/<version>/model.h5           -> Keras checkpoint (fine-tuning, MODEL_RUNTIME=keras)
+#
+# Bundles converted from models trained before bundles existed have no recorded scaler
+# ("scaler": null); they are served with a scaler fitted on the current history, as before.
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from datetime import datetime, timezone
+from lstm_runtime import LSTMRuntime
+
+BUNDLE_FORMAT = 1
+KEEP_VERSIONS = 2
+KERAS_MODEL_FILE = 'model.h5'
+
+
+# Min-max scaling to [0, 1] with the same arithmetic as sklearn's MinMaxScaler
+class MinMaxScaling:
+    def __init__(self, data_min, data_max):
+        self.data_min = float(data_min)
+        self.data_max = float(data_max)
+        self.data_range = (self.data_max - self.data_min) or 1.0  # Constant series, as sklearn does
+
+    @classmethod
+    def fit(cls, values):
+        values = np.asarray(values, dtype=float)
+        return cls(np.nanmin(values), np.nanmax(values))
+
+    def transform(self, values):
+        return (np.asarray(values, dtype=float) - self.data_min) / self.data_range
+
+    def inverse_transform(self, values):
+        return np.asarray(values, dtype=float) * self.data_range + self.data_min
+
+
+class ModelBundle:
+    def __init__(self, path, manifest, model):
+        self.path = path
+        self.manifest = manifest
+        self.model = model
+        scaler = manifest.get('scaler')
+        self.scaling = MinMaxScaling(scaler['data_min'], scaler['data_max']) if scaler else None
+        self.time_step = manifest['time_step']
+        self.model_type = manifest['model_type']
+        self.version = os.path.basename(path)
+
+
+def bundle_dir(models_dir, symbol):
+    return os.path.join(models_dir, f'{symbol}_lstm_bundle')
+
+# Function to resolve the live version of a symbol's bundle, or None if it has none
+def bundle_path(models_dir, symbol):
+    root = bundle_dir(models_dir, symbol)
+    try:
+        with open(os.path.join(root, 'CURRENT')) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(root, version)
+    return path if os.path.isfile(os.path.join(path, 'manifest.json')) else None
+
+# Function to list the symbols that have a live bundle
+def bundle_symbols(models_dir):
+    if not os.path.isdir(models_dir):
+        return []
+    suffix = '_lstm_bundle'
+    return sorted(name[:-len(suffix)] for name in os.listdir(models_dir)
+                  if name.endswith(suffix) and bundle_path(models_dir, name[:-len(suffix)]))
+
+def read_manifest(path):
+    with open(os.path.join(path, 'manifest.json')) as f:
+        return json.load(f)
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Function to write a new bundle version and make it the live one.
+# layers come from lstm_runtime.extract_layers; scaling is the training-time MinMaxScaling
+# (None if unknown); metadata holds symbol, model_type, horizon, time_step, trained_from,
+# trained_through, validation_from and data_version. write_keras_model(path) saves the Keras
+# checkpoint into the version.
+def write_bundle(models_dir, symbol, layers, scaling, metadata, write_keras_model=None):
+    root = bundle_dir(models_dir, symbol)
+    os.makedirs(root, exist_ok=True)
+    version = 'v' + datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')
+
+    # Build the version in a hidden staging directory, then rename it into place
+    staging_dir = tempfile.mkdtemp(dir=root, prefix='.staging-')
+    os.chmod(staging_dir, 0o755)  # mkdtemp is private to its creator; the dashboard may run as another user
+    try:
+        description, files = [], {}
+        for index, layer in enumerate(layers):
+            entry = {}
+            for name, value in layer.items():
+                if isinstance(value, np.ndarray):
+                    filename = f'layer{index}_{name}.npy'
+                    np.save(os.path.join(staging_dir, filename), np.ascontiguousarray(value, dtype=np.float32))
+                    files[filename] = _sha256(os.path.join(staging_dir, filename))
+                else:
+                    entry[name] = value
+            description.append(entry)
+        if write_keras_model is not None:
+            write_keras_model(os.path.join(staging_dir, KERAS_MODEL_FILE))
+            files[KERAS_MODEL_FILE] = _sha256(os.path.join(staging_dir, KERAS_MODEL_FILE))
+
+        manifest = dict(metadata)
+        manifest.update({
+            'format': BUNDLE_FORMAT,
+            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'scaler': {'data_min': scaling.data_min, 'data_max': scaling.data_max} if scaling else None,
+            'layers': description,
+            'files': files,
+        })
+        with open(os.path.join(staging_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging_dir, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    fd, tmp_path = tempfile.mkstemp(dir=root, prefix='.CURRENT-')
+    os.chmod(tmp_path, 0o644)
+    with os.fdopen(fd, 'w') as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(root, 'CURRENT'))
+
+    # Older versions may still be mapped by a running dashboard, so keep a few
+    versions = sorted(name for name in os.listdir(root) if name.startswith('v'))
+    for name in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return version
+
+# Function to get the Keras checkpoint of a bundle version, or None if it has none
+def keras_model_path(path):
+    model_file = os.path.join(path, KERAS_MODEL_FILE)
+    return model_file if os.path.isfile(model_file) else None
+
+# Function to load a bundle version: weights are memory-mapped, not read into memory.
+# verify checks every file against the sha256 in the manifest first. runtime='keras' loads
+# the Keras checkpoint instead of the NumPy weights (needs TensorFlow).
+def load_bundle(path, verify=False, runtime='numpy'):
+    manifest = read_manifest(path)
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported model bundle format in {path}: {manifest.get('format')}")
+
+    if verify:
+        for filename, checksum in manifest['files'].items():
+            if _sha256(os.path.join(path, filename)) != checksum:
+                raise ValueError(f"Checksum mismatch for {filename} in {path}")
+
+    if runtime == 'keras':
+        from tensorflow.keras.models import load_model
+        return ModelBundle(path, manifest, load_model(keras_model_path(path), compile=False))
+
+    layers = []
+    for index, entry in enumerate(manifest['layers']):
+        layer = dict(entry)
+        prefix = f'layer{index}_'
+        for filename in manifest['files']:
+            if filename.startswith(prefix):
+                layer[filename[len(prefix):-len('.npy')]] = np.load(os.path.join(path, filename), mmap_mode='r')
+        layers.append(layer)
+    return ModelBundle(path, manifest, LSTMRuntime(layers))
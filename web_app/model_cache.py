@@ -0,0 +1,133 @@
+# model_cache.py
+# Process-wide LRU cache for the LSTM models, shared by every session.
+# Entries are invalidated when the file's mtime/size (and optionally its hash)
+# changes, and the cache can be warmed up in the background at process start.
+# Models are served from their bundles ({symbol}_lstm_bundle, see model_bundle.py) with
+# the NumPy runtime, so the web process does not need TensorFlow (MODEL_RUNTIME=keras
+# loads the bundle's Keras checkpoint instead).
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import streamlit as st
+from model_bundle import bundle_path, bundle_symbols, load_bundle
+
+MODELS_DIR = os.getenv('MODELS_DIR', 'web_app')
+MODEL_CACHE_SIZE = int(os.getenv('MODEL_CACHE_SIZE', 5))
+MODEL_CACHE_VERIFY_HASH = os.getenv('MODEL_CACHE_VERIFY_HASH', '0') == '1'
+MODEL_WARMUP = os.getenv('MODEL_WARMUP', '0') == '1'
+MODEL_RUNTIME = os.getenv('MODEL_RUNTIME', 'numpy')
+
+# Function to resolve the live bundle version a symbol's model is served from
+def model_path(symbol):
+    path = bundle_path(MODELS_DIR, symbol)
+    if path is None:
+        raise FileNotFoundError(f"No model bundle for {symbol} in {MODELS_DIR}")
+    return path
+
+# Function to list the symbols that have a model
+def available_symbols():
+    return bundle_symbols(MODELS_DIR)
+
+
+class ModelCache:
+    def __init__(self, loader, capacity=MODEL_CACHE_SIZE, verify_hash=MODEL_CACHE_VERIFY_HASH):
+        self.loader = loader
+        self.capacity = capacity
+        self.verify_hash = verify_hash
+        self.entries = OrderedDict()  # path -> (signature, model)
+        self.lock = threading.Lock()
+        self.load_locks = {}
+        self.warmed_up = False
+        self.counters = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+        self.load_seconds = {}  # path -> duration of the most recent load
+
+    # Function to identify the bundle version a cached model was loaded from
+    def _signature(self, path):
+        path = os.path.join(path, 'manifest.json')  # Bundle versions are immutable; the manifest holds the checksums
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.verify_hash:
+            with open(path, 'rb') as f:
+                signature += (hashlib.sha256(f.read()).hexdigest(),)
+        return signature
+
+    def get(self, path):
+        signature = self._signature(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[0] == signature:
+                self.entries.move_to_end(path)
+                self.counters['hits'] += 1
+                return entry[1]
+            load_lock = self.load_locks.setdefault(path, threading.Lock())
+
+        # Only one session loads a given file; the others wait and then hit
+        with load_lock:
+            with self.lock:
+                entry = self.entries.get(path)
+                if entry and entry[0] == signature:
+                    self.entries.move_to_end(path)
+                    self.counters['hits'] += 1
+                    return entry[1]
+                if entry:
+                    self.counters['invalidations'] += 1
+                self.counters['misses'] += 1
+
+            started = time.perf_counter()
+            model = self.loader(path)
+            elapsed = time.perf_counter() - started
+
+            with self.lock:
+                self.load_seconds[path] = elapsed
+                self.entries[path] = (signature, model)
+                self.entries.move_to_end(path)
+                while len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
+                    self.counters['evictions'] += 1
+            return model
+
+    # Function to load models in a background thread so the first user does not pay for it
+    def warm_up(self, paths):
+        with self.lock:
+            if self.warmed_up:
+                return
+            self.warmed_up = True
+
+        def load_all():
+            for path in paths[:self.capacity]:
+                try:
+                    self.get(path)
+                except Exception as e:
+                    print(f"Model warm-up failed for {path}: {e}")
+
+        threading.Thread(target=load_all, name='model-warmup', daemon=True).start()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, size=len(self.entries), capacity=self.capacity,
+                        load_seconds=dict(self.load_seconds))
+
+
+def _load_model(path):
+    return load_bundle(path, verify=MODEL_CACHE_VERIFY_HASH, runtime=MODEL_RUNTIME)
+
+# One cache per process, shared across sessions and reruns
+@st.cache_resource
+def get_model_cache():
+    cache = ModelCache(_load_model)
+    if MODEL_WARMUP:
+        cache.warm_up([model_path(symbol) for symbol in available_symbols()])
+    return cache
+
+# Function to get a symbol's model bundle (model, scaling, type and metadata)
+def load_lstm_bundle(symbol):
+    return get_model_cache().get(model_path(symbol))
+
+def load_lstm_model(symbol):
+    return load_lstm_bundle(symbol).model
+
+def load_model_metadata(symbol):
+    return load_lstm_bundle(symbol).manifest
@@ -0,0 +1,211 @@
+# news_cache.py
+# Process-wide cache of the scraped finviz news, shared by every session.
+# A background thread refreshes it every NEWS_TTL seconds, fetching the tickers
+# concurrently, so pages read the latest snapshot without waiting on finviz and the
+# number of outbound requests does not depend on how many users are connected.
+# Headlines are stored in news_headlines (keyed by ticker and a hash of the URL) with
+# their timestamp (in UTC) and score, so VADER only runs on headlines not seen before.
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import urlopen, Request
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text, bindparam
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from data_access import connect
+from news_parsers import finviz_to_utc, parse_news
+from sentiment_series import update_sentiment_series
+
+NEWS_TICKERS = ['META', 'AAPL', 'MSFT', 'AMZN', 'GOOGL']
+NEWS_TTL = int(os.getenv('NEWS_TTL', 900))
+NEWS_TIMEOUT = int(os.getenv('NEWS_TIMEOUT', 10))
+FINVIZ_URL = 'https://finviz.com/quote.ashx?t='
+
+
+# Function to fetch the raw quote page of one ticker from finviz
+def fetch_quote_page(ticker):
+    req = Request(url=FINVIZ_URL + ticker, headers={'user-agent': 'my-app'})
+    with urlopen(req, timeout=NEWS_TIMEOUT) as response:
+        return response.read()
+
+def headline_hash(url, title):
+    return hashlib.sha1((url or title).encode('utf-8')).hexdigest()
+
+# One analyzer per process; building it loads the VADER lexicon
+_analyzer = None
+
+def get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+def score_headlines(titles):
+    analyzer = get_analyzer()
+    return [analyzer.polarity_scores(title)['compound'] for title in titles]
+
+# Function to look up the scores of already stored headlines; keys are (ticker, headline hash)
+def load_stored_scores(keys):
+    if not keys:
+        return {}
+    query = text("SELECT ticker, headline_hash, sentiment_score FROM news_headlines WHERE headline_hash IN :hashes")
+    with connect() as connection:
+        rows = connection.execute(query.bindparams(bindparam('hashes', expanding=True)),
+                                  {'hashes': sorted({key[1] for key in keys})}).fetchall()
+    return {(row[0], row[1]): row[2] for row in rows if (row[0], row[1]) in keys}
+
+# Function to store newly seen headlines; ones already stored are left untouched
+def store_headlines(news_df):
+    rows = [
+        {'ticker': row.ticker, 'headline_hash': row.headline_hash, 'title': row.title[:512],
+         'url': row.url[:1024] if isinstance(row.url, str) else None,  # Rows without a link store NULL
+         'published_at': None if pd.isna(row.published_at) else row.published_at.to_pydatetime(),
+         'sentiment_score': float(row.sentiment_score)}
+        for row in news_df.itertuples(index=False)
+    ]
+    query = text("""
+        INSERT IGNORE INTO news_headlines (ticker, headline_hash, title, url, published_at, sentiment_score, first_seen_at)
+        VALUES (:ticker, :headline_hash, :title, :url, :published_at, :sentiment_score, UTC_TIMESTAMP())
+    """)
+    with connect(read_only=False) as connection:
+        for offset in range(0, len(rows), 500):
+            connection.execute(query, rows[offset:offset + 500])
+        connection.commit()
+
+# Function to scrape the tickers concurrently and score the headlines. Scores come from
+# `known` ((ticker, hash) -> score of the previous refresh), then the store, and only the rest go
+# through VADER. Returns the news per ticker (tickers that could not be fetched are left
+# out), the scores of every current headline and how many were scored.
+def scrape_and_analyze(tickers, known=None):
+    def scrape(ticker):
+        try:
+            return ticker, parse_news(ticker, fetch_quote_page(ticker))
+        except Exception as e:
+            logging.error(f"Error fetching data for ticker {ticker}: {e}")
+            return ticker, None
+
+    with ThreadPoolExecutor(max_workers=len(tickers)) as executor:
+        results = dict(executor.map(scrape, tickers))
+
+    parsed_data = [row for rows in results.values() if rows for row in rows]
+    news_df = pd.DataFrame(parsed_data, columns=['ticker', 'title', 'url', 'published_at'])
+    news_df['published_at'] = finviz_to_utc(pd.to_datetime(news_df['published_at']))
+    news_df['headline_hash'] = [headline_hash(url, title) for url, title in zip(news_df['url'], news_df['title'])]
+    news_df = news_df.drop_duplicates(['ticker', 'headline_hash'])
+
+    keys = list(zip(news_df['ticker'], news_df['headline_hash']))
+    scores = {key: known[key] for key in keys if known and key in known}
+    try:
+        scores.update(load_stored_scores(set(keys) - set(scores)))
+    except Exception as e:
+        logging.error(f"Error reading stored headlines: {e}")
+
+    is_new = [key not in scores for key in keys]
+    new_df = news_df[is_new]
+    scores.update(zip(zip(new_df['ticker'], new_df['headline_hash']), score_headlines(new_df['title'].tolist())))
+    news_df['sentiment_score'] = [scores[key] for key in keys]
+
+    if not new_df.empty:
+        try:
+            store_headlines(news_df[is_new])
+        except Exception as e:
+            logging.error(f"Error storing headlines: {e}")
+
+    news = {ticker: news_df[news_df['ticker'] == ticker].reset_index(drop=True)
+            for ticker, rows in results.items() if rows is not None}
+    return news, scores, len(new_df)
+
+
+# Immutable view of the cache: the news of every ticker and when it was fetched
+class NewsSnapshot:
+    def __init__(self, news_df, updated_at):
+        self.news_df = news_df
+        self.updated_at = updated_at
+
+
+class NewsCache:
+    def __init__(self, tickers=NEWS_TICKERS, ttl=NEWS_TTL):
+        self.tickers = list(tickers)
+        self.ttl = ttl
+        self.snapshot = None
+        self.by_ticker = {}
+        self.scores = {}  # (ticker, headline hash) -> score, for the headlines currently on finviz
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+        self.thread = None
+        self.counters = {'refreshes': 0, 'failed_fetches': 0, 'scored': 0, 'reused': 0}
+        self.refresh_seconds = None
+
+    # Function to scrape every ticker and swap in a new snapshot; a ticker whose
+    # fetch fails keeps the news of the previous refresh
+    def refresh(self):
+        started = time.perf_counter()
+        news, scores, newly_scored = scrape_and_analyze(self.tickers, self.scores)
+        with self.lock:
+            self.scores = scores
+            self.counters['scored'] += newly_scored
+            self.counters['reused'] += len(scores) - newly_scored
+            self.counters['refreshes'] += 1
+            self.counters['failed_fetches'] += len(self.tickers) - len(news)
+            self.by_ticker.update(news)
+            frames = [self.by_ticker[ticker] for ticker in self.tickers if ticker in self.by_ticker]
+            news_df = pd.concat(frames, ignore_index=True) if frames else None
+            self.snapshot = NewsSnapshot(news_df, pd.Timestamp.now())
+            self.refresh_seconds = time.perf_counter() - started
+        self.loaded.set()
+        # Fold the newly stored headlines into the sentiment series
+        try:
+            update_sentiment_series()
+        except Exception as e:
+            logging.error(f"Error updating the sentiment series: {e}")
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logging.error(f"News refresh failed: {e}")
+                self.loaded.set()  # Do not keep the first page waiting on a failing source
+            time.sleep(self.ttl)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='news-refresher', daemon=True)
+                self.thread.start()
+
+    # Function to read the current snapshot; only the very first read of a process waits
+    # (up to `wait` seconds) for the initial scrape
+    def get(self, wait=30):
+        self.start()
+        if self.snapshot is None:
+            self.loaded.wait(wait)
+        return self.snapshot
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, ttl=self.ttl, refresh_seconds=self.refresh_seconds,
+                        updated_at=None if self.snapshot is None else str(self.snapshot.updated_at))
+
+
+# The process's news cache once the News page has started it
+_started_cache = None
+
+# One cache (and refresher thread) per process, shared across sessions and reruns
+@st.cache_resource
+def get_news_cache():
+    global _started_cache
+    cache = NewsCache()
+    cache.start()
+    _started_cache = cache
+    return cache
+
+# Function to report the news cache statistics without starting the refresher; None until
+# a session has opened the News page
+def news_cache_stats():
+    return None if _started_cache is None else _started_cache.stats()
@@ -0,0 +1,128 @@
+# news_parsers.py
+# Extraction of the finviz news table behind one interface with pluggable backends.
+# The quote page is large but only the news-table fragment is needed, so it is cut out
+# of the raw HTML first and only that fragment is parsed. selectolax and lxml are the
+# fast backends; BeautifulSoup is the fallback, and also parses the whole page when the
+# fragment cannot be located. NEWS_PARSER selects a backend, otherwise the fastest
+# installed one is used. finviz shows news times in US Eastern time; finviz_to_utc
+# converts them to UTC, the zone every stored timestamp uses.
+
+import os
+import re
+import logging
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # Optional fast backend (the lexbor parser needs selectolax >= 0.3.13)
+    HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:  # Optional fast backend
+    lxml = None
+
+NEWS_TABLE_ID = re.compile(rb'''id\s*=\s*["']?news-table["'\s>]''', re.IGNORECASE)
+TABLE_TAG = re.compile(rb'<(/?)table\b', re.IGNORECASE)
+FINVIZ_TZ = 'America/New_York'
+
+
+# Function to cut the <table id="news-table">...</table> fragment out of the raw page,
+# following nested tables to the matching close tag; None if it is not there
+def news_table_fragment(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    match = NEWS_TABLE_ID.search(html)
+    if match is None:
+        return None
+    start = html.rfind(b'<table', 0, match.start())
+    if start < 0:
+        start = html.rfind(b'<TABLE', 0, match.start())
+    if start < 0:
+        return None
+    depth = 0
+    for tag in TABLE_TAG.finditer(html, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start:html.index(b'>', tag.end()) + 1]
+    return html[start:]  # Unclosed table: let the parser recover
+
+
+# Each backend returns (timestamp text, title, url) per row; title and url are None for
+# rows without a link, which still matter because they can carry the day
+def _rows_selectolax(fragment):
+    rows = []
+    for tr in HTMLParser(fragment).css('tr'):
+        td, link = tr.css_first('td'), tr.css_first('a')
+        rows.append((td.text() if td else '', link.text() if link else None, link.attributes.get('href') if link else None))
+    return rows
+
+def _rows_lxml(fragment):
+    rows = []
+    for tr in lxml.html.fromstring(fragment).iter('tr'):
+        cells, links = tr.xpath('./td'), tr.xpath('.//a')
+        rows.append((cells[0].text_content() if cells else '',
+                     links[0].text_content() if links else None, links[0].get('href') if links else None))
+    return rows
+
+def _rows_bs4(fragment):
+    news_table = BeautifulSoup(fragment, features='html.parser').find(id='news-table')
+    rows = []
+    for tr in news_table.findAll('tr') if news_table else []:
+        td, link = tr.find('td'), tr.find('a')
+        rows.append((td.text if td else '', link.text if link else None, link.get('href') if link else None))
+    return rows
+
+BACKENDS = {}
+if HTMLParser is not None:
+    BACKENDS['selectolax'] = _rows_selectolax
+if lxml is not None:
+    BACKENDS['lxml'] = _rows_lxml
+BACKENDS['bs4'] = _rows_bs4
+
+NEWS_PARSER = os.getenv('NEWS_PARSER', next(iter(BACKENDS)))
+
+
+# Function to read finviz's timestamp cell: 'Oct-17-24 09:30AM' or 'Today 09:30AM' starts
+# a day, the following rows of that day only give the time. Returns (timestamp, day).
+# (strptime rather than pd.to_datetime: this runs for every row and dominates otherwise)
+def parse_timestamp(cell_text, current_day):
+    parts = cell_text.split()
+    try:
+        if len(parts) == 2:
+            if parts[0] == 'Today':
+                current_day = datetime.combine(datetime.now(ZoneInfo(FINVIZ_TZ)).date(), datetime.min.time())
+            else:
+                current_day = datetime.strptime(parts[0], '%b-%d-%y')
+        if not parts or current_day is None:
+            return None, current_day
+        time_of_day = datetime.strptime(parts[-1], '%I:%M%p')
+        return current_day + timedelta(hours=time_of_day.hour, minutes=time_of_day.minute), current_day
+    except ValueError:
+        return None, current_day
+
+# Function to convert naive finviz timestamps (a datetime Series) to naive UTC; the hour
+# repeated when daylight saving time ends is ambiguous and becomes NaT
+def finviz_to_utc(timestamps):
+    return (timestamps.dt.tz_localize(FINVIZ_TZ, ambiguous='NaT', nonexistent='shift_forward')
+            .dt.tz_convert('UTC').dt.tz_localize(None))
+
+# Function to extract [ticker, title, url, published_at] rows from a raw finviz quote page
+def parse_news(ticker, html, backend=None):
+    fragment = news_table_fragment(html)
+    extract = BACKENDS[backend or NEWS_PARSER]
+    if fragment is None:
+        fragment, extract = html, _rows_bs4  # Layout changed: search the whole page
+    parsed_data = []
+    current_day = None
+    for timestamp_text, title, url in extract(fragment):
+        try:
+            published_at, current_day = parse_timestamp(timestamp_text, current_day)
+            if title is None:
+                continue  # Skip rows without a link
+            parsed_data.append([ticker, title.strip(), url, published_at])
+        except Exception as e:
+            logging.error(f"Error processing row for ticker {ticker}: {e}")
+    return parsed_data
@@ -0,0 +1,65 @@
+# ohlc.py
+# OHLCV bars for the Overview chart at a resolution that fits the visible range.
+# Daily bars are aggregated once per (symbol, data version) to weekly, monthly,
+# quarterly and yearly bars (first open, max high, min low, last close, summed volume);
+# a chart then gets the finest level with at most MAX_BARS bars in its range, so the
+# payload stays bounded however long the history is.
+
+import pandas as pd
+from data_access import load_daily
+from versioned_cache import versioned_cache
+
+MAX_BARS = 400
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Aggregation levels from finest to coarsest: label -> pandas period frequency (None for daily)
+LEVELS = {'Daily': None, 'Weekly': 'W', 'Monthly': 'M', 'Quarterly': 'Q', 'Yearly': 'Y'}
+
+# Visible ranges offered by the page: label -> offset back from the last bar (None for all)
+RANGES = {
+    '1M': pd.DateOffset(months=1),
+    '3M': pd.DateOffset(months=3),
+    '6M': pd.DateOffset(months=6),
+    '1Y': pd.DateOffset(years=1),
+    '5Y': pd.DateOffset(years=5),
+    '10Y': pd.DateOffset(years=10),
+    'All': None,
+}
+
+
+# Function to aggregate daily bars into one bar per period; each bar is dated by its first trading day
+def resample_ohlcv(daily_df, freq):
+    periods = daily_df['date'].dt.to_period(freq)
+    grouped = daily_df.groupby(periods.to_numpy(), sort=True)
+    return pd.DataFrame({
+        'date': grouped['date'].first().to_numpy(),
+        'open': grouped['open'].first().to_numpy(),
+        'high': grouped['high'].max().to_numpy(),
+        'low': grouped['low'].min().to_numpy(),
+        'close': grouped['close'].last().to_numpy(),
+        'volume': grouped['volume'].sum().to_numpy(),
+    })
+
+# Function to precompute every aggregation level for a symbol (cached until new data arrives)
+@versioned_cache()
+def ohlc_levels(symbol, data_version):
+    daily_df = load_daily(symbol, columns=OHLCV_COLUMNS)[['date'] + list(OHLCV_COLUMNS)].reset_index(drop=True)
+    return {label: daily_df if freq is None else resample_ohlcv(daily_df, freq) for label, freq in LEVELS.items()}
+
+# Function to get the bars for a visible range: the finest level that fits in MAX_BARS.
+# Returns (bars, level label).
+def chart_bars(symbol, data_version, range_label='All', max_bars=MAX_BARS):
+    levels = ohlc_levels(symbol, data_version)
+    daily_df = levels['Daily']
+    if daily_df.empty or RANGES[range_label] is None:
+        start = None
+    else:
+        start = daily_df['date'].iloc[-1] - RANGES[range_label]
+
+    for label, bars in levels.items():
+        if start is not None:
+            # Keep the bar that contains the start so the range is fully covered
+            first = max(bars['date'].searchsorted(start, side='right') - 1, 0)
+            bars = bars.iloc[first:]
+        if len(bars) <= max_bars or label == 'Yearly':
+            return bars, label
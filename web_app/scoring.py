@@ -0,0 +1,179 @@
+# scoring.py
+# Investment scores for any number of symbols in one vectorized pass.
+# Rolling windows are computed from cumulative sums over the rows of each symbol,
+# so there is no per-row Python and no per-symbol loop. The caller's frame is only
+# read; the factors come back as a new frame aligned on its index.
+# ScoreState extends one symbol's score series a bar at a time in O(1).
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_WEIGHTS = {
+    'price_momentum': 0.25,
+    'volatility_score': 0.25,
+    'volume_score': 0.20,
+    'ema_sma_score': 0.20,
+    'rsi_score': 0.10,
+}
+MA_WINDOWS = (10, 50, 200)
+VOLUME_WINDOW = 50
+
+
+# Function to compute a rolling mean that restarts at every group boundary.
+# values must be ordered by group; group_start[i] is the position of the first row of row i's group.
+# A window containing NaN gives NaN, like pandas' rolling().mean().
+def _grouped_rolling_mean(values, group_start, window):
+    positions = np.arange(len(values))
+    missing = np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    gaps = np.concatenate(([0], np.cumsum(missing)))
+    lower = np.clip(positions - window + 1, 0, None)
+    mean = (sums[positions + 1] - sums[lower]) / window
+    mean[(positions - window + 1 < group_start) | (gaps[positions + 1] - gaps[lower] > 0)] = np.nan
+    return mean
+
+
+# Function to compute every factor, the composite score and the signal for all symbols.
+# Expects columns symbol, close, high, low, volume, ema, rsi with each symbol's rows in date order.
+def compute_scores(df, weights=DEFAULT_WEIGHTS):
+    codes = pd.factorize(df['symbol'])[0]
+    order = np.argsort(codes, kind='stable')  # Groups contiguous, date order kept within each group
+    sorted_codes = codes[order]
+    first_row = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+    group_start = np.maximum.accumulate(np.where(first_row, np.arange(len(order)), 0))
+
+    def column(name):
+        return df[name].to_numpy(dtype=float)[order]
+
+    close, high, low, volume = column('close'), column('high'), column('low'), column('volume')
+    ema, rsi = column('ema'), column('rsi')
+
+    factors = {}
+    for window in MA_WINDOWS:
+        factors[f'ma_{window}'] = _grouped_rolling_mean(close, group_start, window)
+
+    prev_close = np.r_[np.nan, close[:-1]]
+    prev_close[first_row] = np.nan
+    volume_mean = _grouped_rolling_mean(volume, group_start, VOLUME_WINDOW)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factors['price_momentum'] = (close - prev_close) / prev_close * 100
+        factors['volatility_score'] = (high - low) / close * 100
+        factors['volume_score'] = (volume - volume_mean) / volume_mean * 100
+    factors['ema_sma_score'] = np.where(ema > factors['ma_50'], 1, -1)
+    factors['rsi_score'] = np.where(rsi < 30, 2, np.where(rsi > 70, -2, 0))
+
+    score = sum(weight * factors[name] for name, weight in weights.items())
+    factors['investment_score'] = score
+    factors['signal'] = np.select([score > 0, score < 0], ['Buy', 'Sell'], 'Hold')
+
+    # Scatter back from group order to the caller's row order
+    restore = np.empty_like(order)
+    restore[order] = np.arange(len(order))
+    return pd.DataFrame({name: values[restore] for name, values in factors.items()}, index=df.index)
+
+
+# Fixed-size ring buffer with a running sum; mean is NaN until full or while it holds a NaN
+class RollingWindow:
+    def __init__(self, size):
+        self.size = size
+        self.values = [0.0] * size
+        self.position = 0
+        self.count = 0
+        self.total = 0.0
+        self.nan_count = 0
+
+    def push(self, value):
+        old = self.values[self.position]
+        if self.count == self.size:
+            if np.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        else:
+            self.count += 1
+        if np.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+        return self.mean()
+
+    def mean(self):
+        if self.count < self.size or self.nan_count:
+            return np.nan
+        return self.total / self.size
+
+    def to_dict(self):
+        # Values oldest first, so the state does not depend on the buffer position
+        ordered = self.values[self.position:] + self.values[:self.position] if self.count == self.size else self.values[:self.count]
+        return {'size': self.size, 'values': [None if np.isnan(v) else v for v in ordered]}
+
+    @classmethod
+    def from_dict(cls, data):
+        window = cls(data['size'])
+        for value in data['values']:
+            window.push(np.nan if value is None else value)
+        return window
+
+
+# Streaming score state for one symbol: feeding it one daily bar updates every factor
+# and the composite score in constant time. to_dict()/from_dict() checkpoint it as JSON.
+class ScoreState:
+    def __init__(self, weights=DEFAULT_WEIGHTS):
+        self.weights = dict(weights)
+        self.close_windows = {window: RollingWindow(window) for window in MA_WINDOWS}
+        self.volume_window = RollingWindow(VOLUME_WINDOW)
+        self.prev_close = np.nan
+        self.last_date = None
+
+    # Function to fold one bar (close, high, low, volume, ema, rsi and optionally date) into the state
+    def update(self, bar):
+        close, high, low = float(bar['close']), float(bar['high']), float(bar['low'])
+        volume, ema, rsi = float(bar['volume']), float(bar['ema']), float(bar['rsi'])
+
+        factors = {f'ma_{window}': self.close_windows[window].push(close) for window in MA_WINDOWS}
+        volume_mean = self.volume_window.push(volume)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors['price_momentum'] = (close - self.prev_close) / self.prev_close * 100
+            factors['volatility_score'] = (high - low) / close * 100
+            factors['volume_score'] = (volume - volume_mean) / volume_mean * 100
+        factors['ema_sma_score'] = 1 if ema > factors['ma_50'] else -1
+        factors['rsi_score'] = 2 if rsi < 30 else (-2 if rsi > 70 else 0)
+
+        score = sum(weight * factors[name] for name, weight in self.weights.items())
+        factors['investment_score'] = score
+        factors['signal'] = 'Buy' if score > 0 else ('Sell' if score < 0 else 'Hold')
+
+        self.prev_close = close
+        if 'date' in bar:
+            self.last_date = pd.Timestamp(bar['date'])
+        return factors
+
+    # Function to build the state from a symbol's history; only the longest window's tail matters
+    @classmethod
+    def from_history(cls, df, weights=DEFAULT_WEIGHTS):
+        state = cls(weights)
+        for bar in df.tail(max(MA_WINDOWS + (VOLUME_WINDOW,)) + 1).to_dict('records'):
+            state.update(bar)
+        return state
+
+    def to_dict(self):
+        return {
+            'weights': self.weights,
+            'close_windows': {str(window): buffer.to_dict() for window, buffer in self.close_windows.items()},
+            'volume_window': self.volume_window.to_dict(),
+            'prev_close': None if np.isnan(self.prev_close) else self.prev_close,
+            'last_date': None if self.last_date is None else self.last_date.strftime('%Y-%m-%d'),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['weights'])
+        state.close_windows = {int(window): RollingWindow.from_dict(buffer) for window, buffer in data['close_windows'].items()}
+        state.volume_window = RollingWindow.from_dict(data['volume_window'])
+        state.prev_close = np.nan if data['prev_close'] is None else data['prev_close']
+        state.last_date = None if data['last_date'] is None else pd.Timestamp(data['last_date'])
+        return state
@@ -0,0 +1,132 @@
+# sentiment_series.py
+# Per-ticker sentiment time series built incrementally from the stored headlines.
+# Each run folds only the news_headlines rows not folded yet (marked by their `folded`
+# flag in the same transaction) into daily and hourly (count, sum) buckets and into
+# exponentially decayed sums, so the cost follows the number of new headlines. Buckets
+# are in UTC. Rolling means are read off the daily buckets; sentiment_daily is keyed by
+# (symbol, date) to join directly with daily_data.
+
+import json
+import numpy as np
+import pandas as pd
+from sqlalchemy import text, bindparam
+from data_access import connect
+
+HALF_LIVES = {'1d': 1.0, '7d': 7.0, '30d': 30.0}  # Decay half-lives in days
+ROLLING_WINDOWS = (1, 7, 30)  # Rolling means in days
+LOCK_NAME = 'sentiment_series'
+FOLD_BATCH = 1000  # Headlines marked as folded per UPDATE
+
+
+# Exponentially decayed mean for one ticker and half-life: `total` and `weight` are the
+# score sum and the weight sum as of `as_of`, so adding a headline is O(1) in any order
+class DecayedMean:
+    def __init__(self, half_life, total=0.0, weight=0.0, as_of=None):
+        self.half_life = half_life
+        self.total = total
+        self.weight = weight
+        self.as_of = as_of
+
+    def add(self, timestamp, score):
+        if self.as_of is None:
+            self.as_of = timestamp
+        days = (timestamp - self.as_of).total_seconds() / 86400
+        if days >= 0:
+            # Newer than the reference: decay what we have up to it
+            factor = 0.5 ** (days / self.half_life)
+            self.total, self.weight, self.as_of = self.total * factor + score, self.weight * factor + 1.0, timestamp
+        else:
+            factor = 0.5 ** (-days / self.half_life)
+            self.total += score * factor
+            self.weight += factor
+
+    # Decaying both sums by the same factor leaves the mean unchanged, so it holds at any time
+    def mean(self):
+        return self.total / self.weight if self.weight else np.nan
+
+    def to_dict(self):
+        return {'total': self.total, 'weight': self.weight,
+                'as_of': None if self.as_of is None else self.as_of.strftime('%Y-%m-%d %H:%M:%S')}
+
+    @classmethod
+    def from_dict(cls, half_life, data):
+        return cls(half_life, data['total'], data['weight'], None if data['as_of'] is None else pd.Timestamp(data['as_of']))
+
+
+def _decays_from_state(state):
+    return {name: DecayedMean.from_dict(half_life, state[name]) if name in state else DecayedMean(half_life)
+            for name, half_life in HALF_LIVES.items()}
+
+# Function to fold the headlines not folded yet into the buckets and decayed sums. Runs
+# under a MySQL named lock so concurrent refreshers never count a headline twice; the
+# rows are marked as folded in the same transaction as the sums they went into.
+def update_sentiment_series():
+    with connect(read_only=False) as connection:
+        if not connection.execute(text("SELECT GET_LOCK(:name, 10)"), {'name': LOCK_NAME}).scalar():
+            return 0
+        try:
+            # Ids are not committed in order, so the rows to fold are tracked by flag, not by the highest id
+            new_df = pd.read_sql(text("""
+                SELECT id, ticker AS symbol, COALESCE(published_at, first_seen_at) AS published_at, sentiment_score
+                FROM news_headlines WHERE folded = 0 ORDER BY id
+            """), connection)
+            if new_df.empty:
+                return 0
+            new_df['published_at'] = pd.to_datetime(new_df['published_at'])
+
+            daily = new_df.groupby(['symbol', new_df['published_at'].dt.date]).agg(
+                n_headlines=('sentiment_score', 'size'), sum_score=('sentiment_score', 'sum')).reset_index()
+            hourly = new_df.groupby(['symbol', new_df['published_at'].dt.floor('h')]).agg(
+                n_headlines=('sentiment_score', 'size'), sum_score=('sentiment_score', 'sum')).reset_index()
+            for table, key, buckets in (('sentiment_daily', 'date', daily), ('sentiment_hourly', 'hour', hourly)):
+                connection.execute(text(f"""
+                    INSERT INTO {table} (symbol, {key}, n_headlines, sum_score) VALUES (:symbol, :bucket, :n, :total)
+                    ON DUPLICATE KEY UPDATE n_headlines = n_headlines + VALUES(n_headlines), sum_score = sum_score + VALUES(sum_score)
+                """), [{'symbol': row[0], 'bucket': row[1].to_pydatetime() if key == 'hour' else row[1],
+                        'n': int(row[2]), 'total': float(row[3])} for row in buckets.itertuples(index=False)])
+
+            states = {row[0]: json.loads(row[1]) if isinstance(row[1], (str, bytes)) else row[1]
+                      for row in connection.execute(text("SELECT symbol, state FROM sentiment_state"))}
+            state_rows = []
+            for symbol, group in new_df.groupby('symbol'):
+                decays = _decays_from_state(states.get(symbol) or {})
+                for published_at, score in zip(group['published_at'], group['sentiment_score']):
+                    for decay in decays.values():
+                        decay.add(published_at, float(score))
+                state_rows.append({'symbol': symbol,
+                                   'state': json.dumps({name: decay.to_dict() for name, decay in decays.items()})})
+            connection.execute(text("""
+                INSERT INTO sentiment_state (symbol, state, updated_at) VALUES (:symbol, :state, UTC_TIMESTAMP())
+                ON DUPLICATE KEY UPDATE state = VALUES(state), updated_at = VALUES(updated_at)
+            """), state_rows)
+            mark_folded = text("UPDATE news_headlines SET folded = 1 WHERE id IN :ids").bindparams(
+                bindparam('ids', expanding=True))
+            ids = new_df['id'].astype(int).tolist()
+            for offset in range(0, len(ids), FOLD_BATCH):
+                connection.execute(mark_folded, {'ids': ids[offset:offset + FOLD_BATCH]})
+            connection.commit()
+            return len(new_df)
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.execute(text("SELECT RELEASE_LOCK(:name)"), {'name': LOCK_NAME})
+
+# Function to turn daily buckets into rolling means over calendar days (days without
+# headlines count as empty, not as missing)
+def rolling_sentiment(daily_df, windows=ROLLING_WINDOWS):
+    if daily_df.empty:
+        return pd.DataFrame(columns=['date'] + [f'mean_{window}d' for window in windows])
+    buckets = daily_df.set_index(pd.to_datetime(daily_df['date']))[['n_headlines', 'sum_score']]
+    buckets = buckets.asfreq('D', fill_value=0)
+    series = pd.DataFrame(index=buckets.index)
+    for window in windows:
+        sums = buckets.rolling(window, min_periods=1).sum()
+        series[f'mean_{window}d'] = sums['sum_score'] / sums['n_headlines'].replace(0, np.nan)
+    return series.rename_axis('date').reset_index()
+
+# Function to read the decayed means out of a ticker's stored state
+def decayed_means(state):
+    if isinstance(state, (str, bytes)):
+        state = json.loads(state)
+    return {name: decay.mean() for name, decay in _decays_from_state(state or {}).items()}
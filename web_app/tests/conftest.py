@@ -0,0 +1,10 @@
+# conftest.py
+# The web app modules and scheduled jobs are imported as top-level scripts (as Streamlit
+# and the scheduler run them)
+
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+sys.path.insert(0, os.path.join(ROOT, 'web_app'))
+sys.path.insert(0, os.path.join(ROOT, 'scheduled_update_database'))
@@ -0,0 +1,53 @@
+# test_indicator_engine.py
+# Folding new days into the incremental indicator state must give the same values as
+# recomputing the full history, also after the state went through its JSON checkpoint.
+
+import json
+import numpy as np
+import pandas as pd
+
+from indicator_engine import INDICATOR_SPECS, build_states, compute_indicators, state_matches, step
+
+ATOL = 1e-9
+
+
+def synthetic_daily(n_symbols=3, n_days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(n_symbols):
+        frames.append(pd.DataFrame({
+            'symbol': f'SYM{i}',
+            'date': pd.bdate_range('2020-01-01', periods=n_days),
+            'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_days))),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_incremental_steps_match_full_recompute():
+    daily_df = synthetic_daily()
+    cutoff = pd.bdate_range('2020-01-01', periods=200)[-1]
+    history, new_days = daily_df[daily_df['date'] <= cutoff], daily_df[daily_df['date'] > cutoff]
+
+    # Checkpointed as technical_indicators.py stores it
+    states = json.loads(json.dumps(build_states(history)))
+    stepped = []
+    for row in new_days.itertuples(index=False):
+        stepped.append(dict(step(states[row.symbol], row.date, row.close), symbol=row.symbol, date=row.date))
+    stepped = pd.DataFrame(stepped).sort_values(['symbol', 'date']).reset_index(drop=True)
+
+    full = compute_indicators(daily_df)
+    full = full[full['date'] > cutoff].reset_index(drop=True)
+    for spec in INDICATOR_SPECS:
+        np.testing.assert_allclose(stepped[spec['column']], full[spec['column']], rtol=0, atol=ATOL)
+
+
+def test_short_history_gets_no_state():
+    daily_df = synthetic_daily(n_symbols=1, n_days=max(spec['period'] for spec in INDICATOR_SPECS))
+    assert build_states(daily_df) == {}
+
+
+def test_state_matches_the_configured_specs():
+    state = build_states(synthetic_daily(n_symbols=1))['SYM0']
+    assert state_matches(state)
+    assert not state_matches(None)
+    assert not state_matches(state, [dict(spec, period=spec['period'] + 1) for spec in INDICATOR_SPECS])
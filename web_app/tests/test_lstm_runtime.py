@@ -0,0 +1,81 @@
+# test_lstm_runtime.py
+# The NumPy runtime must reproduce model.predict of the Keras models it is exported from,
+# both directly and through the model bundles the dashboard loads.
+#
+#   python -m pytest web_app/tests
+
+import os
+import numpy as np
+import pytest
+
+tf = pytest.importorskip('tensorflow')
+
+from lstm_runtime import LSTMRuntime, extract_layers
+from export_lstm_weights import DEFAULT_TOLERANCE, verified_layers
+from model_bundle import MinMaxScaling, bundle_path, bundle_symbols, keras_model_path, load_bundle, write_bundle
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TIME_STEP = 60
+ATOL = 1e-5  # float32 forward pass of the same weights; differences are rounding only
+
+
+# Same stack as create_lstm_model.create_lstm_model, with fewer units to keep the test fast
+def build_model(outputs=1, units=16, seed=0):
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(TIME_STEP, 1)),
+        tf.keras.layers.LSTM(units, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(units, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(units),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(outputs),
+    ])
+    # Non-zero biases so every gate term is exercised
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if weights:
+            weights[-1] = np.random.default_rng(seed).normal(scale=0.1, size=weights[-1].shape).astype(np.float32)
+            layer.set_weights(weights)
+    return model
+
+def sample_windows(n=64, seed=1):
+    return np.random.default_rng(seed).random((n, TIME_STEP, 1), dtype=np.float32)
+
+
+@pytest.mark.parametrize('outputs', [1, 30])
+def test_runtime_matches_keras_predict(outputs):
+    model = build_model(outputs)
+    X = sample_windows()
+    expected = model.predict(X, verbose=0)
+    runtime = LSTMRuntime(extract_layers(model))
+    np.testing.assert_allclose(runtime.predict(X), expected, rtol=0, atol=ATOL)
+    np.testing.assert_allclose(runtime.predict(X[..., 0]), expected, rtol=0, atol=ATOL)  # (batch, time_step) input
+
+def test_runtime_batches_and_empty_input():
+    model = build_model()
+    X = sample_windows(10)
+    runtime = LSTMRuntime(extract_layers(model))
+    np.testing.assert_allclose(runtime.predict(X, batch_size=3), runtime.predict_on_batch(X), rtol=0, atol=1e-7)
+    assert runtime.predict(X[:0]).shape == (0, 1)
+
+def test_bundle_round_trip(tmp_path):
+    model = build_model()
+    X = sample_windows()
+    layers, _ = verified_layers(model)
+    write_bundle(str(tmp_path), 'TEST', layers, MinMaxScaling(10.0, 20.0), {'model_type': 'recursive', 'time_step': TIME_STEP},
+                 write_keras_model=model.save)
+    bundle = load_bundle(bundle_path(str(tmp_path), 'TEST'), verify=True)
+    assert (bundle.scaling.data_min, bundle.scaling.data_max, bundle.model_type) == (10.0, 20.0, 'recursive')
+    np.testing.assert_allclose(bundle.model.predict(X), model.predict(X, verbose=0), rtol=0, atol=ATOL)
+    assert keras_model_path(bundle.path) is not None
+
+# The bundles committed with the app must still agree with their Keras checkpoints
+@pytest.mark.parametrize('symbol', bundle_symbols(MODELS_DIR))
+def test_committed_bundle_matches_checkpoint(symbol):
+    path = bundle_path(MODELS_DIR, symbol)
+    bundle = load_bundle(path, verify=True)
+    model = tf.keras.models.load_model(keras_model_path(path), compile=False)
+    X = sample_windows()
+    np.testing.assert_allclose(bundle.model.predict(X), model.predict(X, verbose=0), rtol=0, atol=DEFAULT_TOLERANCE)
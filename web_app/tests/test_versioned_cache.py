@@ -0,0 +1,89 @@
+# test_versioned_cache.py
+# Keys, LRU eviction, TTL expiry and read-only sharing of the page computation cache.
+
+import itertools
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+
+import versioned_cache
+from versioned_cache import VersionedCache, cache_stats
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(versioned_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+# Each test decorates its own function so the process-wide caches do not collide
+_names = itertools.count()
+
+def counted(maxsize=versioned_cache.DEFAULT_MAXSIZE, ttl=versioned_cache.DEFAULT_TTL):
+    calls = []
+
+    def compute(symbol, data_version, *args, **kwargs):
+        calls.append((symbol, data_version, args, kwargs))
+        return pd.DataFrame({'close': np.arange(3.0)})
+    compute.__qualname__ = f'compute_{next(_names)}'
+    return versioned_cache.versioned_cache(maxsize, ttl)(compute), calls
+
+
+def test_hit_requires_same_symbol_version_and_params():
+    compute, calls = counted()
+    compute('AAPL', 'v1', 10, weights={'a': 1, 'b': 2})
+    compute('AAPL', 'v1', 10, weights={'b': 2, 'a': 1})  # dicts are keyed by value
+    assert len(calls) == 1
+    compute('MSFT', 'v1', 10, weights={'a': 1, 'b': 2})
+    compute('AAPL', 'v2', 10, weights={'a': 1, 'b': 2})
+    compute('AAPL', 'v1', 20, weights={'a': 1, 'b': 2})
+    compute('AAPL', 'v1', 10, weights={'a': 1, 'b': 3})
+    assert len(calls) == 5
+
+
+def test_least_recently_used_entry_is_evicted():
+    compute, calls = counted(maxsize=2)
+    compute('A', 'v1')
+    compute('B', 'v1')
+    compute('A', 'v1')  # A is now the most recently used
+    compute('C', 'v1')  # evicts B
+    compute('A', 'v1')
+    assert len(calls) == 3
+    compute('B', 'v1')
+    assert len(calls) == 4
+    stats = cache_stats()[f"{__name__}.{compute.__qualname__}"]
+    assert stats['evictions'] == 2 and stats['size'] == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    compute, calls = counted(ttl=60)
+    compute('A', 'v1')
+    clock[0] += 59
+    compute('A', 'v1')
+    assert len(calls) == 1
+    clock[0] += 2
+    compute('A', 'v1')
+    assert len(calls) == 2
+
+
+def test_hits_share_the_frozen_value():
+    compute, _ = counted()
+    first, second = compute('A', 'v1'), compute('A', 'v1')
+    assert first is second
+    with pytest.raises(ValueError):
+        first.loc[0, 'close'] = 5.0
+    local = first.copy()  # callers that change a result work on a copy
+    local.loc[0, 'close'] = 5.0
+    assert compute('A', 'v1').loc[0, 'close'] == 0.0
+
+
+def test_cache_counters(clock):
+    cache = VersionedCache(maxsize=1, ttl=10)
+    cache.put('a', 1)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('b') == (False, None)
+    clock[0] += 11
+    assert cache.get('a') == (False, None)
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'evictions': 0, 'expirations': 1, 'size': 0, 'maxsize': 1}
@@ -0,0 +1,119 @@
+# versioned_cache.py
+# Cache for page computations keyed on (function, symbol, data_version, params)
+# instead of hashing whole DataFrames. The data version changes with every
+# ingestion run, so stale entries are never hit and simply age out.
+# Cached values are shared read-only across sessions: their arrays and DataFrames are
+# frozen, so a caller that needs to change a result copies it first.
+
+import time
+import threading
+import functools
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_MAXSIZE = 64
+DEFAULT_TTL = 24 * 3600
+
+
+# Bounded LRU cache with a time-to-live per entry and hit/miss counters
+class VersionedCache:
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self.entries.move_to_end(key)
+                    self.counters['hits'] += 1
+                    return True, entry[1]
+                del self.entries[key]
+                self.counters['expirations'] += 1
+            self.counters['misses'] += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.counters['evictions'] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, size=len(self.entries), maxsize=self.maxsize)
+
+
+# One registry of caches per process, shared across sessions and reruns
+@st.cache_resource
+def _registry():
+    return {}
+
+_registry_lock = threading.Lock()
+
+def _get_cache(name, maxsize, ttl):
+    registry = _registry()
+    with _registry_lock:
+        if name not in registry:
+            registry[name] = VersionedCache(maxsize, ttl)
+        return registry[name]
+
+# Function to turn parameters into a hashable key part (dicts and lists by value)
+def _key_part(value):
+    if isinstance(value, dict):
+        return tuple(sorted((k, _key_part(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_key_part(v) for v in value)
+    return value
+
+# Function to make an array read-only; datetime-like extension arrays wrap an ndarray
+def _freeze_array(array):
+    array = getattr(array, '_ndarray', array)
+    if isinstance(array, np.ndarray):
+        array.setflags(write=False)
+
+# Function to make the arrays and DataFrame/Series blocks of a cached value read-only;
+# it is handed out without copying
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        for block in value._mgr.blocks:
+            _freeze_array(block.values)
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            _freeze(item)
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    return value
+
+# Decorator for functions called as fn(symbol, data_version, *params, **params)
+def versioned_cache(maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL):
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(symbol, data_version, *args, **kwargs):
+            cache = _get_cache(name, maxsize, ttl)
+            key = (symbol, data_version, _key_part(args), _key_part(kwargs))
+            found, value = cache.get(key)
+            if not found:
+                value = _freeze(fn(symbol, data_version, *args, **kwargs))
+                cache.put(key, value)
+            return value
+
+        return wrapper
+    return decorator
+
+# Function to report hit/miss statistics for every versioned cache
+def cache_stats():
+    return {name: cache.stats() for name, cache in _registry().items()}
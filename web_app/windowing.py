@@ -0,0 +1,49 @@
+# windowing.py
+# Sliding-window datasets for the LSTM models, shared by training and serving.
+# Windows are strided views over the input series, so building them is O(1) and
+# memory stays O(N); only the batches handed to a model are materialised.
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Function to flatten a (N,) or (N, 1) series to 1-D without copying
+def _as_series(data):
+    series = np.asarray(data)
+    return series[:, 0] if series.ndim == 2 else series
+
+# Function to build one-step-ahead windows: X[i] = data[i:i + time_step], y[i] = data[i + time_step]
+# X is a read-only view of shape (N - time_step, time_step); use X[..., None] for the LSTM input shape
+def create_dataset(data, time_step=60):
+    series = _as_series(data)
+    if len(series) <= time_step:
+        return np.empty((0, time_step), dtype=series.dtype), np.empty(0, dtype=series.dtype)
+    return sliding_window_view(series, time_step)[:-1], series[time_step:]
+
+# Function to build direct multi-horizon windows: X[i] = data[i:i + time_step],
+# Y[i] = data[i + time_step:i + time_step + horizon]; both are read-only views
+def create_multi_horizon_dataset(data, time_step=60, horizon=30):
+    series = _as_series(data)
+    count = len(series) - time_step - horizon + 1
+    if count <= 0:
+        return np.empty((0, time_step), dtype=series.dtype), np.empty((0, horizon), dtype=series.dtype)
+    return sliding_window_view(series, time_step)[:count], sliding_window_view(series[time_step:], horizon)
+
+# Function to iterate over (X, y) batches shaped for the LSTM, copying one batch at a time.
+# start/stop select a range of windows (e.g. a chronological validation split), or indices
+# selects an arbitrary subset; y may be None.
+def iter_batches(X, y=None, batch_size=64, start=0, stop=None, shuffle=False, seed=None, indices=None):
+    contiguous = indices is None and not shuffle
+    indices = np.arange(start, len(X) if stop is None else stop) if indices is None else np.array(indices)
+    if shuffle:
+        np.random.default_rng(seed).shuffle(indices)
+    for offset in range(0, len(indices), batch_size):
+        batch = indices[offset:offset + batch_size]
+        if contiguous:
+            batch = slice(batch[0], batch[-1] + 1)  # Contiguous range: one slice instead of fancy indexing
+        X_batch = np.ascontiguousarray(X[batch][..., None], dtype=np.float32)
+        yield X_batch, (None if y is None else np.asarray(y[batch], dtype=np.float32))
+
+# Function to run a model over every window in batches, so the N x time_step input is never built at once
+def predict_windows(predict_fn, X, batch_size=1024):
+    outputs = [np.asarray(predict_fn(X_batch)) for X_batch, _ in iter_batches(X, batch_size=batch_size)]
+    return np.concatenate(outputs) if outputs else np.empty((0, 1), dtype=np.float32)